@@ -1,5 +1,6 @@
-from flask import jsonify, request
+from flask import Response, current_app, jsonify, request
 from backend.api import api_bp
+from backend.services.metrics import registry
 from backend.services.anomaly_detector import AnomalyDetector
 from backend.services.data_stream import DataStream
 
@@ -12,6 +13,20 @@ def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy'})
 
+@api_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Metrics endpoint in Prometheus text format (JSON with ?format=json)"""
+    if request.args.get('format') == 'json':
+        return jsonify(registry.snapshot())
+        
+    return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@api_bp.route('/drift', methods=['GET'])
+def get_drift():
+    """Get drift monitoring state of the running detector"""
+    detector = current_app.extensions.get('anomaly_detector', anomaly_detector)
+    return jsonify(detector.drift_state())
+
 @api_bp.route('/anomalies', methods=['GET'])
 def get_anomalies():
     """Get detected anomalies"""
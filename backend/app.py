@@ -1,14 +1,22 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_socketio import SocketIO
+import logging
 import os
 
 from backend.api import api_bp
 from backend.services.data_stream import DataStream
 from backend.services.anomaly_detector import AnomalyDetector
-from backend.services.db_service import DatabaseService
+from backend.services.storage import create_storage
+from backend.services.metrics import registry
 import backend.config as config
 
+# Metrics
+HANDLE_POINT_SECONDS = registry.histogram('handle_data_point_seconds', 'Latency of handling an incoming data point in seconds')
+STORE_ERRORS = registry.counter('store_errors_total', 'Failed attempts to store a data point')
+
+logger = logging.getLogger(__name__)
+
 # Initialize Flask app
 app = Flask(__name__)
 app.config.from_object(config)
@@ -21,18 +29,33 @@ socketio = SocketIO(app, cors_allowed_origins=config.CORS_ORIGINS)
 
 # Initialize services
 data_stream = DataStream()
+db_service = create_storage(
+    config.STORAGE_BACKEND,
+    postgres_url=config.POSTGRES_URL,
+    redis_url=config.REDIS_URL,
+    path=config.COLUMNAR_STORAGE_PATH
+)
 anomaly_detector = AnomalyDetector(
     window_size=config.DETECTION_WINDOW_SIZE,
-    model_type=config.DEFAULT_MODEL_TYPE
-)
-db_service = DatabaseService(
-    postgres_url=config.POSTGRES_URL,
-    redis_url=config.REDIS_URL
+    model_type=config.DEFAULT_MODEL_TYPE,
+    queue_capacity=config.INGEST_QUEUE_CAPACITY,
+    overflow_policy=config.INGEST_OVERFLOW_POLICY,
+    threshold_quantile=config.THRESHOLD_QUANTILE,
+    threshold_min_samples=config.THRESHOLD_MIN_SAMPLES,
+    db_service=db_service,
+    alert_emit_interval=config.ALERT_EMIT_INTERVAL,
+    alert_gap_tolerance=config.ALERT_GAP_TOLERANCE,
+    drift_threshold=config.DRIFT_THRESHOLD,
+    drift_max_burst=config.DRIFT_MAX_BURST,
+    ensemble_weights=config.ENSEMBLE_WEIGHTS
 )
 
 # Register blueprint
 app.register_blueprint(api_bp, url_prefix='/api')
 
+# Share the live detector with the API routes
+app.extensions['anomaly_detector'] = anomaly_detector
+
 # Set socketio instance in services
 data_stream.set_socketio(socketio)
 anomaly_detector.set_socketio(socketio)
@@ -63,6 +86,34 @@ def handle_start_stream(data):
     
     return {'status': 'started'}
 
+@socketio.on('start_replay')
+def handle_start_replay(data):
+    """Replay a recorded stream from REPLAY_DIR"""
+    replay_dir = os.path.realpath(config.REPLAY_DIR)
+    path = os.path.realpath(os.path.join(replay_dir, data.get('file', '')))
+    if os.path.commonpath([replay_dir, path]) != replay_dir or not os.path.isfile(path):
+        return {'status': 'error', 'error': 'Unknown recording'}
+        
+    # A recording replayed at max speed stamps points ahead of the clock;
+    # start the stream afresh so later runs are not skipped as seen
+    anomaly_detector.alert_engine.reset_stream(anomaly_detector.stream)
+    
+    # Start replay
+    try:
+        data_stream.start_replay(
+            path,
+            speed=data.get('speed', 1.0),
+            format=data.get('format'),
+            chunk_size=config.REPLAY_CHUNK_SIZE
+        )
+    except ValueError as e:
+        return {'status': 'error', 'error': str(e)}
+        
+    # Start anomaly detection
+    anomaly_detector.start_detection(interval=config.DETECTION_INTERVAL)
+    
+    return {'status': 'started'}
+
 @socketio.on('stop_stream')
 def handle_stop_stream():
     """Stop data stream simulation"""
@@ -74,18 +125,24 @@ def handle_stop_stream():
 @socketio.on('data_point')
 def handle_data_point(data):
     """Process incoming data point"""
-    # Add to anomaly detector
-    anomaly_detector.add_data_point(data['value'])
-    
-    # Store in database (async in production)
-    try:
-        db_service.store_data_point(
-            data['timestamp'],
-            data['value'],
-            data.get('is_anomaly', False)
-        )
-    except Exception as e:
-        print(f"Error storing data point: {e}")
+    with HANDLE_POINT_SECONDS.time():
+        # Add to anomaly detector
+        anomaly_detector.add_data_point(data['value'], data.get('timestamp'))
+        
+        # Store in database (async in production)
+        try:
+            db_service.store_data_point(
+                data['timestamp'],
+                data['value'],
+                data.get('is_anomaly', False)
+            )
+        except Exception:
+            STORE_ERRORS.inc()
+            logger.exception("Error storing data point")
+
+# Replayed points take the same path as points sent by clients
+data_stream.set_point_handler(handle_data_point)
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
     socketio.run(app, host='0.0.0.0', port=5000, debug=config.DEBUG)
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""Benchmark suite for the anomaly detection backend
+
+Run with ``python -m backend.benchmarks.run_benchmarks``.
+"""
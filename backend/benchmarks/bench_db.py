@@ -0,0 +1,180 @@
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+from backend.benchmarks.bench_models import synthetic_series
+from backend.benchmarks.harness import run_benchmark, skipped
+
+
+class InMemoryCursor:
+    """Minimal DB-API cursor that stores inserted rows in memory"""
+    
+    def __init__(self, connection):
+        """Initialize the cursor
+        
+        Args:
+            connection: Owning InMemoryConnection
+        """
+        self.connection = connection
+        self.last_id = None
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc, tb):
+        return False
+        
+    def execute(self, query, params=None):
+        """Record an INSERT and assign it a row ID
+        
+        Args:
+            query: SQL statement
+            params: Statement parameters
+        """
+        if query.lstrip().upper().startswith('INSERT'):
+            self.connection.rows.append(params)
+            self.last_id = len(self.connection.rows)
+            
+    def fetchone(self):
+        """Return the ID of the last inserted row"""
+        return (self.last_id,)
+
+
+class InMemoryConnection:
+    """Stand-in for a psycopg2 connection that keeps rows in a list"""
+    
+    def __init__(self):
+        """Initialize the row store"""
+        self.rows = []
+        self.commits = 0
+        
+    def cursor(self):
+        """Create a cursor"""
+        return InMemoryCursor(self)
+        
+    def commit(self):
+        """Count commits"""
+        self.commits += 1
+        
+    def close(self):
+        """Nothing to release"""
+        pass
+
+
+def _make_service(postgres_url=None, columnar_path=None):
+    """Create a storage backend, backed by memory when no URL or path is given"""
+    if columnar_path:
+        from backend.services.columnar_storage import ColumnarStorage
+        return ColumnarStorage(columnar_path)
+        
+    from backend.services.db_service import DatabaseService
+    
+    if postgres_url:
+        service = DatabaseService(postgres_url=postgres_url)
+        service.connect_postgres()
+    else:
+        service = DatabaseService()
+        service.postgres_conn = InMemoryConnection()
+    return service
+
+
+def bench_db_writes(postgres_url=None, columnar_path=None, iterations=1000):
+    """Benchmark storage backend writes
+    
+    Args:
+        postgres_url: PostgreSQL URL
+        columnar_path: Directory for the columnar backend
+        iterations: Number of timed writes per benchmark
+        
+    Without a URL or path, DatabaseService runs against an in-memory
+    connection stand-in.
+        
+    Returns:
+        List of result dicts
+    """
+    if columnar_path:
+        params = {'backend': 'columnar'}
+    else:
+        params = {'backend': 'postgres' if postgres_url else 'memory'}
+    
+    try:
+        service = _make_service(postgres_url, columnar_path)
+    except ImportError as e:
+        return [skipped('db', f"dependencies unavailable: {e}", params)]
+        
+    base = datetime.utcnow()
+    counter = iter(range(10 ** 9))
+    
+    def next_timestamp():
+        return (base + timedelta(milliseconds=next(counter))).isoformat()
+        
+    results = []
+    try:
+        results.append(run_benchmark(
+            'db.store_data_point',
+            lambda ts: service.store_data_point(ts, 1.0, False),
+            setup=next_timestamp,
+            iterations=iterations, warmup=10, params=params
+        ))
+        
+        data_point_id = service.store_data_point(next_timestamp(), 1.0, True)
+        results.append(run_benchmark(
+            'db.store_anomaly',
+            lambda ts: service.store_anomaly(ts, data_point_id, 0.5, 'isolation_forest'),
+            setup=next_timestamp,
+            iterations=iterations, warmup=10, params=params
+        ))
+    finally:
+        service.close()
+        
+    return results
+
+
+
+def bench_columnar_reads(n_points=1_000_000, iterations=20):
+    """Benchmark bulk writes and range reads of the columnar backend
+    
+    Args:
+        n_points: Number of points written and scanned
+        iterations: Timed iterations per read benchmark
+        
+    Returns:
+        List of result dicts
+    """
+    from backend.services.columnar_storage import ColumnarStorage
+    
+    params = {'backend': 'columnar', 'n_points': n_points}
+    path = tempfile.mkdtemp(prefix='bench_columnar_')
+    storage = ColumnarStorage(path, partition_seconds=3600)
+    
+    base = datetime(2026, 1, 1)
+    values = synthetic_series(n_points)
+    points = [
+        (base + timedelta(milliseconds=10 * i), float(value), False)
+        for i, value in enumerate(values)
+    ]
+    end = points[-1][0] + timedelta(seconds=1)
+    middle = points[n_points // 2][0]
+    
+    results = []
+    try:
+        results.append(run_benchmark(
+            'columnar.store_data_points',
+            lambda: storage.store_data_points(points),
+            iterations=1, warmup=0, items_per_call=n_points, params=params
+        ))
+        results.append(run_benchmark(
+            'columnar.read_range.full',
+            lambda: storage.read_range(base, end)[1].sum(),
+            iterations=iterations, items_per_call=n_points, params=params
+        ))
+        results.append(run_benchmark(
+            'columnar.read_range.one_minute',
+            lambda: storage.read_range(middle, middle + timedelta(minutes=1))[1].sum(),
+            iterations=iterations, items_per_call=6000, params=params
+        ))
+    finally:
+        storage.close()
+        shutil.rmtree(path, ignore_errors=True)
+        
+    return results
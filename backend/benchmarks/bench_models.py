@@ -0,0 +1,94 @@
+import numpy as np
+
+from backend.benchmarks.harness import run_benchmark, skipped
+from backend.ml_models.isolation_forest import AnomalyIsolationForest
+
+
+def synthetic_series(n_points, anomaly_rate=0.05, seed=0):
+    """Generate a noisy sine wave with injected outliers
+    
+    Args:
+        n_points: Number of points to generate
+        anomaly_rate: Fraction of points shifted into outliers
+        seed: Random seed
+        
+    Returns:
+        1D numpy array of values
+    """
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 8 * np.pi, n_points)
+    data = np.sin(t) + rng.normal(0, 0.1, n_points)
+    
+    mask = rng.random(n_points) < anomaly_rate
+    data[mask] += rng.choice([-2, 2], size=mask.sum())
+    return data
+
+
+def bench_isolation_forest(window_sizes, iterations=20):
+    """Benchmark Isolation Forest fit, predict and score
+    
+    Args:
+        window_sizes: Window sizes to benchmark
+        iterations: Timed iterations per benchmark
+        
+    Returns:
+        List of result dicts
+    """
+    results = []
+    for window_size in window_sizes:
+        data = synthetic_series(window_size)
+        params = {'window_size': window_size}
+        
+        model = AnomalyIsolationForest(contamination=0.05)
+        results.append(run_benchmark(
+            'isolation_forest.fit', lambda: model.fit(data),
+            iterations=iterations, items_per_call=window_size, params=params
+        ))
+        results.append(run_benchmark(
+            'isolation_forest.predict', lambda: model.predict(data),
+            iterations=iterations, items_per_call=window_size, params=params
+        ))
+        results.append(run_benchmark(
+            'isolation_forest.anomaly_score', lambda: model.anomaly_score(data),
+            iterations=iterations, items_per_call=window_size, params=params
+        ))
+        
+    return results
+
+
+def bench_lstm(window_sizes, iterations=5, epochs=1):
+    """Benchmark LSTM autoencoder fit, predict and score
+    
+    Args:
+        window_sizes: Window sizes to benchmark
+        iterations: Timed iterations per benchmark
+        epochs: Training epochs per fit call
+        
+    Returns:
+        List of result dicts
+    """
+    try:
+        from backend.ml_models.lstm_detector import LSTMAnomalyDetector
+    except ImportError as e:
+        return [skipped('lstm', f"tensorflow unavailable: {e}")]
+        
+    results = []
+    for window_size in window_sizes:
+        data = synthetic_series(window_size)
+        params = {'window_size': window_size, 'epochs': epochs}
+        
+        model = LSTMAnomalyDetector(seq_length=10, n_features=1)
+        results.append(run_benchmark(
+            'lstm.fit', lambda: model.fit(data, epochs=epochs),
+            iterations=iterations, warmup=1, items_per_call=window_size, params=params
+        ))
+        results.append(run_benchmark(
+            'lstm.predict', lambda: model.predict(data),
+            iterations=iterations, warmup=1, items_per_call=window_size, params=params
+        ))
+        results.append(run_benchmark(
+            'lstm.anomaly_score', lambda: model.anomaly_score(data),
+            iterations=iterations, warmup=1, items_per_call=window_size, params=params
+        ))
+        
+    return results
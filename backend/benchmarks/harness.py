@@ -0,0 +1,171 @@
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+def percentile_summary(samples):
+    """Summarize latency samples
+    
+    Args:
+        samples: Sequence of latencies in seconds
+        
+    Returns:
+        Dict of latency statistics in milliseconds
+    """
+    if len(samples) == 0:
+        return {'count': 0}
+        
+    values = np.asarray(samples, dtype=float) * 1000.0
+    return {
+        'count': int(len(values)),
+        'mean_ms': float(np.mean(values)),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p90_ms': float(np.percentile(values, 90)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(np.max(values))
+    }
+
+
+def run_benchmark(name, fn, iterations=20, warmup=2, items_per_call=1, setup=None, params=None):
+    """Time repeated calls of a function
+    
+    Args:
+        name: Benchmark name
+        fn: Callable to time; receives the value returned by setup (if any)
+        iterations: Number of timed calls
+        warmup: Number of untimed calls before measuring
+        items_per_call: Items processed per call, used for throughput
+        setup: Optional callable run before every call, outside the timer
+        params: Optional dict of parameters recorded with the result
+        
+    Returns:
+        Dict with latency percentiles and throughput
+    """
+    def call():
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        return time.perf_counter() - start
+        
+    for _ in range(warmup):
+        call()
+        
+    samples = [call() for _ in range(iterations)]
+    
+    total = sum(samples)
+    result = {
+        'name': name,
+        'params': params or {},
+        'latency': percentile_summary(samples),
+        'throughput_per_sec': (iterations * items_per_call / total) if total > 0 else None
+    }
+    return result
+
+
+def skipped(name, reason, params=None):
+    """Build a result entry for a benchmark that could not run
+    
+    Args:
+        name: Benchmark name
+        reason: Why the benchmark was skipped
+        params: Optional dict of parameters
+        
+    Returns:
+        Result dict marked as skipped
+    """
+    return {'name': name, 'params': params or {}, 'skipped': reason}
+
+
+class BenchmarkReport:
+    """Collects benchmark results into a machine-readable report"""
+    
+    def __init__(self):
+        """Initialize an empty report with environment metadata"""
+        self.results = []
+        self.metadata = {
+            'created_at': datetime.utcnow().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': np.__version__
+        }
+        
+    def add(self, result):
+        """Add a benchmark result
+        
+        Args:
+            result: Result dict from run_benchmark or skipped
+        """
+        self.results.append(result)
+        
+    def extend(self, results):
+        """Add several benchmark results
+        
+        Args:
+            results: Iterable of result dicts
+        """
+        for result in results:
+            self.add(result)
+            
+    def to_dict(self):
+        """Convert the report to a dict
+        
+        Returns:
+            Dict with metadata and results
+        """
+        return {'metadata': self.metadata, 'results': self.results}
+        
+    def write(self, path):
+        """Write the report as JSON
+        
+        Args:
+            path: Output file path
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def _result_key(result):
+    """Build a stable key identifying a benchmark result"""
+    return result['name'] + json.dumps(result.get('params', {}), sort_keys=True)
+
+
+def compare_reports(baseline, current, tolerance=0.2):
+    """Compare two reports and find p99 latency regressions
+    
+    Args:
+        baseline: Baseline report dict
+        current: Current report dict
+        tolerance: Allowed relative p99 increase before flagging a regression
+        
+    Returns:
+        List of regression dicts
+    """
+    baseline_results = {
+        _result_key(r): r for r in baseline.get('results', []) if 'latency' in r
+    }
+    
+    regressions = []
+    for result in current.get('results', []):
+        if 'latency' not in result:
+            continue
+            
+        previous = baseline_results.get(_result_key(result))
+        if previous is None:
+            continue
+            
+        old_p99 = previous['latency'].get('p99_ms')
+        new_p99 = result['latency'].get('p99_ms')
+        if old_p99 and new_p99 and new_p99 > old_p99 * (1 + tolerance):
+            regressions.append({
+                'name': result['name'],
+                'params': result.get('params', {}),
+                'baseline_p99_ms': old_p99,
+                'current_p99_ms': new_p99,
+                'change': new_p99 / old_p99 - 1
+            })
+            
+    return regressions
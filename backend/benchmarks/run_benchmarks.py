@@ -0,0 +1,85 @@
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+
+from backend.benchmarks.bench_db import bench_columnar_reads, bench_db_writes
+from backend.benchmarks.bench_models import bench_isolation_forest, bench_lstm
+from backend.benchmarks.bench_service import bench_detector, bench_detector_under_load
+from backend.benchmarks.harness import BenchmarkReport, compare_reports
+
+SUITES = ('models', 'lstm', 'ensemble', 'service', 'db', 'columnar')
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Run anomaly detection benchmarks')
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=['models', 'service', 'db', 'columnar'],
+                        help='Benchmark suites to run')
+    parser.add_argument('--window-sizes', nargs='+', type=int, default=[50, 100, 500, 1000],
+                        help='Window sizes for model and detector benchmarks')
+    parser.add_argument('--iterations', type=int, default=20,
+                        help='Timed iterations per model benchmark')
+    parser.add_argument('--load-rate', type=int, default=1000,
+                        help='Points per second for the service load run')
+    parser.add_argument('--load-duration', type=float, default=5.0,
+                        help='Seconds for the service load run')
+    parser.add_argument('--postgres-url', default=None,
+                        help='Benchmark DB writes against this PostgreSQL URL instead of memory')
+    parser.add_argument('--output', default='bench_output.json',
+                        help='Path of the JSON report')
+    parser.add_argument('--baseline', default=None,
+                        help='Previous JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative p99 increase against the baseline')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the selected suites and write the report
+    
+    Returns:
+        Process exit code; 1 if regressions were found against the baseline
+    """
+    args = parse_args(argv)
+    report = BenchmarkReport()
+    
+    if 'models' in args.suites:
+        report.extend(bench_isolation_forest(args.window_sizes, iterations=args.iterations))
+    if 'lstm' in args.suites:
+        report.extend(bench_lstm(args.window_sizes, iterations=max(1, args.iterations // 4)))
+    if 'ensemble' in args.suites:
+        report.extend(bench_detector(args.window_sizes, model_type='ensemble', iterations=max(1, args.iterations // 4)))
+    if 'service' in args.suites:
+        report.extend(bench_detector(args.window_sizes, iterations=args.iterations))
+        report.extend(bench_detector_under_load(rate=args.load_rate, duration=args.load_duration))
+    if 'db' in args.suites:
+        report.extend(bench_db_writes(postgres_url=args.postgres_url))
+    if 'columnar' in args.suites:
+        path = tempfile.mkdtemp(prefix='bench_columnar_')
+        try:
+            report.extend(bench_db_writes(columnar_path=path))
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+        report.extend(bench_columnar_reads())
+        
+    report.write(args.output)
+    print(f"Wrote {len(report.results)} results to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+            
+        regressions = compare_reports(baseline, report.to_dict(), tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']} {regression['params']}: "
+                  f"p99 {regression['baseline_p99_ms']:.3f}ms -> {regression['current_p99_ms']:.3f}ms")
+        if regressions:
+            return 1
+            
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import math
+import threading
+
+class PageHinkleyDriftDetector:
+    """Two-sided Page-Hinkley test for distribution drift
+    
+    Values, typically a model's anomaly scores, are standardized against a
+    reference mean and standard deviation learned from the first
+    warmup_samples values after each reset. Cumulative sums
+    track upward and downward mean shifts, and drift is flagged when
+    either exceeds the threshold. Standardized values are clipped so that
+    isolated anomalies cannot signal drift on their own.
+    
+    Outliers are held back: points the model flags, and points at least
+    clip reference deviations out, which covers the tail of a burst the
+    model has stopped flagging once its window fills with it. A run of at
+    most max_burst outliers is an incident rather than a change, and is
+    dropped so it neither accumulates towards drift nor enters the
+    reference. A longer run is a sustained change and is fed in, so large
+    shifts are confirmed max_burst points late. Memory is O(max_burst).
+    """
+    
+    def __init__(self, delta=0.5, threshold=10.0, warmup_samples=50, clip=3.0, max_burst=20):
+        """Initialize the detector
+        
+        Args:
+            delta: Tolerated change per point, in reference standard deviations
+            threshold: Cumulative deviation that signals drift
+            warmup_samples: Points used to learn the reference distribution
+            clip: Largest standardized deviation a single point contributes
+            max_burst: Longest run of anomalous points treated as an incident
+        """
+        self.delta = delta
+        self.threshold = threshold
+        self.clip = clip
+        self.warmup_samples = warmup_samples
+        self.max_burst = max_burst
+        self.drift_count = 0
+        self.reset()
+        
+    def reset(self):
+        """Forget the reference distribution, cumulative sums and held points"""
+        self.held = []
+        self.anomalous_run = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.std = None
+        self.sum_up = 0.0
+        self.sum_down = 0.0
+        
+    @property
+    def is_warm(self):
+        """Whether the reference distribution has been learned"""
+        return self.std is not None
+        
+    @property
+    def statistic(self):
+        """Largest of the cumulative sums"""
+        return max(self.sum_up, self.sum_down)
+        
+    def update(self, value, is_anomaly=False):
+        """Add a value and test for drift
+        
+        Args:
+            value: Numeric value
+            is_anomaly: Whether the model flagged the value as anomalous
+                (outliers beyond clip are held back either way)
+            
+        Returns:
+            True if drift was detected; the detector then resets
+        """
+        if not (is_anomaly or self._is_outlier(value)):
+            # A run that ended within max_burst points was an incident
+            self.held = []
+            self.anomalous_run = 0
+            return self._update(value)
+            
+        self.anomalous_run += 1
+        self.held.append(value)
+        if self.anomalous_run <= self.max_burst:
+            return False
+            
+        # The run outlasted an incident; feed it in, including held points
+        held, self.held = self.held, []
+        drifted = False
+        for held_value in held:
+            drifted = self._update(held_value) or drifted
+        return drifted
+        
+    def _is_outlier(self, value):
+        """Whether a value lies at least clip deviations from the reference"""
+        return self.is_warm and abs(float(value) - self.mean) >= self.clip * self.std
+        
+    def _update(self, value):
+        """Add a value to the reference or the cumulative sums"""
+        value = float(value)
+        
+        # Learn the reference distribution (Welford)
+        if self.std is None:
+            self.n += 1
+            diff = value - self.mean
+            self.mean += diff / self.n
+            self.m2 += diff * (value - self.mean)
+            if self.n >= self.warmup_samples:
+                self.std = max(math.sqrt(self.m2 / (self.n - 1)), 1e-9)
+            return False
+            
+        z = min(max((value - self.mean) / self.std, -self.clip), self.clip)
+        self.sum_up = max(0.0, self.sum_up + z - self.delta)
+        self.sum_down = max(0.0, self.sum_down - z - self.delta)
+        
+        if self.statistic > self.threshold:
+            self.drift_count += 1
+            self.reset()
+            return True
+        return False
+        
+    def state(self):
+        """Get the detector state
+        
+        Returns:
+            JSON-serializable dict
+        """
+        return {
+            'warm': self.is_warm,
+            'reference_mean': self.mean if self.is_warm else None,
+            'reference_std': self.std,
+            'statistic': self.statistic,
+            'threshold': self.threshold,
+            'anomalous_run': self.anomalous_run,
+            'drift_count': self.drift_count
+        }
+
+
+class DriftMonitors:
+    """Per-stream drift detectors"""
+    
+    def __init__(self, **detector_kwargs):
+        """Initialize the collection
+        
+        Args:
+            detector_kwargs: Arguments for each new PageHinkleyDriftDetector
+        """
+        self.detector_kwargs = detector_kwargs
+        self.streams = {}
+        self.lock = threading.Lock()
+        
+    def get(self, stream):
+        """Get the detector for a stream, creating it if needed
+        
+        Args:
+            stream: Stream identifier
+            
+        Returns:
+            PageHinkleyDriftDetector instance
+        """
+        detector = self.streams.get(stream)
+        if detector is None:
+            with self.lock:
+                detector = self.streams.setdefault(stream, PageHinkleyDriftDetector(**self.detector_kwargs))
+        return detector
+        
+    def state(self):
+        """Get the state of every stream's detector
+        
+        Returns:
+            Dict keyed by stream
+        """
+        with self.lock:
+            streams = dict(self.streams)
+        return {stream: detector.state() for stream, detector in streams.items()}
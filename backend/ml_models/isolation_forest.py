@@ -16,6 +16,9 @@ class AnomalyIsolationForest:
         )
         self.is_fitted = False
         
+        # predict flags points whose anomaly_score is above zero
+        self.threshold = 0.0
+        
     def fit(self, data):
         """Fit the model to the data
         
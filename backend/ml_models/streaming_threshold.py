@@ -0,0 +1,168 @@
+import threading
+import numpy as np
+from backend.ml_models.tdigest import TDigest
+
+class StreamingThreshold:
+    """Anomaly threshold that tracks a score quantile as scores arrive"""
+    
+    def __init__(self, quantile=0.95, compression=100, min_samples=50, decay=1.0, decay_interval=1000):
+        """Initialize the threshold
+        
+        Args:
+            quantile: Score quantile used as the threshold
+            compression: t-digest compression (memory stays O(compression))
+            min_samples: Scores needed before the threshold is used
+            decay: Weight multiplier applied every decay_interval scores,
+                so older scores fade out (1.0 keeps the full history)
+            decay_interval: Number of scores between decay steps
+        """
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.decay = decay
+        self.decay_interval = decay_interval
+        self.digest = TDigest(compression=compression)
+        self.updates_since_decay = 0
+        
+    @property
+    def is_ready(self):
+        """Whether enough scores have been seen to use the threshold"""
+        return self.digest.count >= self.min_samples
+        
+    @property
+    def value(self):
+        """Current threshold, or None before warm-up"""
+        if not self.is_ready:
+            return None
+        return self.digest.quantile(self.quantile)
+        
+    def update(self, scores):
+        """Add newly scored points
+        
+        Args:
+            scores: Iterable of anomaly scores (NaNs are ignored)
+        """
+        for score in scores:
+            if np.isnan(score):
+                continue
+            self.digest.update(score)
+            self.updates_since_decay += 1
+            
+            if self.decay < 1.0 and self.updates_since_decay >= self.decay_interval:
+                self.digest.scale(self.decay)
+                self.updates_since_decay = 0
+                
+    def predict(self, scores):
+        """Classify scores against the current threshold
+        
+        Args:
+            scores: numpy array of anomaly scores
+            
+        Returns:
+            numpy array where 1 is normal, -1 is anomaly, or None before warm-up
+        """
+        threshold = self.value
+        if threshold is None:
+            return None
+            
+        scores = np.asarray(scores, dtype=float)
+        predictions = np.ones(len(scores))
+        predictions[scores > threshold] = -1
+        return predictions
+        
+    def merge(self, other):
+        """Merge another threshold's sketch into this one
+        
+        Args:
+            other: StreamingThreshold to merge
+        """
+        self.digest.merge(other.digest)
+        
+    def to_dict(self):
+        """Serialize the threshold state
+        
+        Returns:
+            JSON-serializable dict
+        """
+        return {
+            'quantile': self.quantile,
+            'min_samples': self.min_samples,
+            'decay': self.decay,
+            'decay_interval': self.decay_interval,
+            'digest': self.digest.to_dict()
+        }
+        
+    @classmethod
+    def from_dict(cls, state):
+        """Restore a threshold serialized with to_dict
+        
+        Args:
+            state: Dict produced by to_dict
+            
+        Returns:
+            StreamingThreshold instance
+        """
+        threshold = cls(
+            quantile=state['quantile'],
+            min_samples=state['min_samples'],
+            decay=state['decay'],
+            decay_interval=state['decay_interval']
+        )
+        threshold.digest = TDigest.from_dict(state['digest'])
+        return threshold
+
+
+class StreamingThresholds:
+    """Per-stream streaming thresholds"""
+    
+    def __init__(self, **threshold_kwargs):
+        """Initialize the collection
+        
+        Args:
+            threshold_kwargs: Arguments for each new StreamingThreshold
+        """
+        self.threshold_kwargs = threshold_kwargs
+        self.streams = {}
+        self.lock = threading.Lock()
+        
+    def get(self, stream):
+        """Get the threshold for a stream, creating it if needed
+        
+        Args:
+            stream: Stream identifier
+            
+        Returns:
+            StreamingThreshold instance
+        """
+        threshold = self.streams.get(stream)
+        if threshold is None:
+            with self.lock:
+                threshold = self.streams.setdefault(stream, StreamingThreshold(**self.threshold_kwargs))
+        return threshold
+        
+    def reset(self, stream):
+        """Discard the threshold of a stream, e.g. after its model was refitted
+        
+        Args:
+            stream: Stream identifier
+        """
+        with self.lock:
+            self.streams.pop(stream, None)
+            
+    def merge_state(self, state):
+        """Merge thresholds serialized by another worker
+        
+        Args:
+            state: Dict produced by another instance's to_dict
+        """
+        for stream, threshold_state in state.items():
+            self.get(stream).merge(StreamingThreshold.from_dict(threshold_state))
+            
+    def to_dict(self):
+        """Serialize all stream thresholds
+        
+        Returns:
+            Dict keyed by stream
+        """
+        with self.lock:
+            streams = dict(self.streams)
+        return {stream: threshold.to_dict() for stream, threshold in streams.items()}
@@ -0,0 +1,231 @@
+import math
+import numpy as np
+
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest)
+    
+    Keeps at most O(compression) centroids regardless of how many values
+    are added, with the best accuracy in the tails where anomaly
+    thresholds live.
+    """
+    
+    def __init__(self, compression=100):
+        """Initialize an empty digest
+        
+        Args:
+            compression: Accuracy/size trade-off; the number of centroids
+                stays within a small multiple of this value
+        """
+        self.compression = compression
+        self.buffer_size = 5 * compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.buffer = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        
+    def update(self, value, weight=1.0):
+        """Add a single value
+        
+        Args:
+            value: Value to add
+            weight: Weight of the value
+        """
+        value = float(value)
+        self.buffer.append((value, float(weight)))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        
+        if len(self.buffer) >= self.buffer_size:
+            self._compress()
+            
+    def update_many(self, values):
+        """Add several values with unit weight
+        
+        Args:
+            values: Iterable of values
+        """
+        for value in values:
+            self.update(value)
+            
+    def _k(self, q):
+        """Scale function mapping a quantile to centroid index space"""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+        
+    def _k_inverse(self, k):
+        """Inverse of the scale function"""
+        return (math.sin(min(k, self.compression / 4) * 2 * math.pi / self.compression) + 1) / 2
+        
+    def _compress(self):
+        """Merge buffered values into the centroids"""
+        if not self.buffer:
+            return
+            
+        buffered = np.array(self.buffer)
+        self.buffer = []
+        
+        means = np.concatenate([self.means, buffered[:, 0]])
+        weights = np.concatenate([self.weights, buffered[:, 1]])
+        order = np.argsort(means, kind='mergesort')
+        means = means[order]
+        weights = weights[order]
+        
+        total = weights.sum()
+        new_means = []
+        new_weights = []
+        
+        cur_mean = means[0]
+        cur_weight = weights[0]
+        weight_so_far = 0.0
+        q_limit = self._k_inverse(self._k(0.0) + 1)
+        
+        for mean, weight in zip(means[1:], weights[1:]):
+            if (weight_so_far + cur_weight + weight) / total <= q_limit:
+                # Fold into the current centroid
+                cur_weight += weight
+                cur_mean += (mean - cur_mean) * weight / cur_weight
+            else:
+                new_means.append(cur_mean)
+                new_weights.append(cur_weight)
+                weight_so_far += cur_weight
+                q_limit = self._k_inverse(self._k(weight_so_far / total) + 1)
+                cur_mean = mean
+                cur_weight = weight
+                
+        new_means.append(cur_mean)
+        new_weights.append(cur_weight)
+        
+        self.means = np.array(new_means)
+        self.weights = np.array(new_weights)
+        
+    def quantile(self, q):
+        """Estimate the value at a quantile
+        
+        Args:
+            q: Quantile in [0, 1]
+            
+        Returns:
+            Estimated value, or None if the digest is empty
+        """
+        self._compress()
+        if self.count == 0 or len(self.means) == 0:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+            
+        # Centroid centres sit at the midpoint of their cumulative weight
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        
+        return float(np.interp(q * total, positions, values))
+        
+    def cdf(self, value):
+        """Estimate the fraction of values less than or equal to value
+        
+        Args:
+            value: Value to look up
+            
+        Returns:
+            Fraction in [0, 1], or None if the digest is empty
+        """
+        self._compress()
+        if self.count == 0 or len(self.means) == 0:
+            return None
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+            
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        
+        return float(np.interp(value, values, positions) / total)
+        
+    def cdf_many(self, values):
+        """Estimate the cdf of several values at once
+        
+        Args:
+            values: Iterable of values to look up
+            
+        Returns:
+            numpy array of fractions in [0, 1], or None if the digest is empty
+        """
+        self._compress()
+        if self.count == 0 or len(self.means) == 0:
+            return None
+            
+        values = np.asarray(values, dtype=float)
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        knots = np.concatenate([[self.min], self.means, [self.max]])
+        
+        fractions = np.interp(values, knots, positions) / total
+        fractions[values < self.min] = 0.0
+        fractions[values >= self.max] = 1.0
+        return fractions
+        
+    def scale(self, factor):
+        """Multiply all weights by a factor, fading out older values
+        
+        Args:
+            factor: Weight multiplier in (0, 1]
+        """
+        self._compress()
+        self.weights = self.weights * factor
+        self.count *= factor
+        
+    def merge(self, other):
+        """Merge another digest into this one
+        
+        Args:
+            other: TDigest to merge
+        """
+        other._compress()
+        for mean, weight in zip(other.means, other.weights):
+            self.buffer.append((float(mean), float(weight)))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        
+    def to_dict(self):
+        """Serialize the digest
+        
+        Returns:
+            JSON-serializable dict
+        """
+        self._compress()
+        return {
+            'compression': self.compression,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist(),
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+        
+    @classmethod
+    def from_dict(cls, state):
+        """Restore a digest serialized with to_dict
+        
+        Args:
+            state: Dict produced by to_dict
+            
+        Returns:
+            TDigest instance
+        """
+        digest = cls(compression=state['compression'])
+        digest.means = np.array(state['means'], dtype=float)
+        digest.weights = np.array(state['weights'], dtype=float)
+        digest.count = state['count']
+        if state['min'] is not None:
+            digest.min = state['min']
+            digest.max = state['max']
+        return digest
@@ -0,0 +1,346 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from backend.services.metrics import registry
+
+# Metrics
+EMIT_SECONDS = registry.histogram('emit_seconds', 'Latency of emitting an anomaly event in seconds')
+ANOMALIES_EMITTED = registry.counter('anomalies_emitted_total', 'Anomaly events emitted')
+EMITS_SUPPRESSED = registry.counter('emits_suppressed_total', 'Anomaly events held back by the rate limit')
+INCIDENTS_OPENED = registry.counter('incidents_opened_total', 'Anomaly incidents opened')
+INCIDENTS_PERSISTED = registry.counter('incidents_persisted_total', 'Anomaly incidents written to the database')
+PERSIST_ERRORS = registry.counter('incident_persist_errors_total', 'Failed attempts to persist incidents')
+
+logger = logging.getLogger(__name__)
+
+
+def _to_datetime(timestamp):
+    """Convert an ISO string or datetime to a datetime"""
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    return timestamp
+
+
+def _to_iso(timestamp):
+    """Format a datetime or ISO string as an ISO string"""
+    if isinstance(timestamp, datetime):
+        return timestamp.isoformat()
+    return str(timestamp)
+
+
+class Incident:
+    """A run of consecutive anomalous points in one stream"""
+    
+    def __init__(self, stream, index, timestamp, value, score, threshold=None):
+        """Open an incident at its first anomalous point
+        
+        Args:
+            stream: Stream identifier
+            index: Position of the first point in the stream
+            timestamp: Timestamp of the first point
+            value: Value of the first point
+            score: Anomaly score of the first point
+            threshold: Threshold the point was classified against
+        """
+        self.stream = stream
+        self.start = timestamp
+        self.end = timestamp
+        self.peak_index = index
+        self.peak_timestamp = timestamp
+        self.peak_value = value
+        self.peak_score = score
+        self.threshold = threshold
+        self.point_count = 1
+        self.normal_run = 0
+        
+        # Whether the incident changed since it was last emitted
+        self.dirty = True
+        self.emitted = False
+        
+    @property
+    def incident_id(self):
+        """Stable identifier derived from the stream and start time"""
+        return f"{self.stream}:{_to_iso(self.start)}"
+        
+    def add(self, index, timestamp, value, score, threshold=None):
+        """Extend the incident with another anomalous point
+        
+        Args:
+            index: Position of the point in the stream
+            timestamp: Timestamp of the point
+            value: Value of the point
+            score: Anomaly score of the point
+            threshold: Threshold the point was classified against
+        """
+        self.end = timestamp
+        self.point_count += 1
+        self.normal_run = 0
+        if threshold is not None:
+            self.threshold = threshold
+        if score > self.peak_score:
+            self.peak_index = index
+            self.peak_timestamp = timestamp
+            self.peak_value = value
+            self.peak_score = score
+            self.dirty = True
+            
+    def to_dict(self, status='open'):
+        """Build the event payload for this incident
+        
+        Args:
+            status: 'open' or 'closed'
+            
+        Returns:
+            Dict with the fields of an anomaly event plus incident details
+        """
+        return {
+            'incident_id': self.incident_id,
+            'stream': self.stream,
+            'status': status,
+            'index': self.peak_index,
+            'timestamp': _to_iso(self.peak_timestamp),
+            'value': float(self.peak_value),
+            'score': float(self.peak_score),
+            'threshold': self.threshold,
+            'start': _to_iso(self.start),
+            'end': _to_iso(self.end),
+            'point_count': self.point_count
+        }
+
+
+class AlertEngine:
+    """Turns per-point anomaly predictions into deduplicated incidents
+    
+    Each point is identified by its stream and timestamp and is only
+    considered once, however many detection windows it appears in.
+    Consecutive anomalous points are merged into an incident, events are
+    rate-limited per stream, and closed incidents are written in bulk.
+    An update held back by the rate limit is kept, the most severe one per
+    stream, and sent once the stream's interval has passed.
+    """
+    
+    def __init__(self, model_type, socketio=None, db_service=None, gap_tolerance=0,
+                 emit_interval=1.0, flush_size=100, flush_interval=5.0):
+        """Initialize the alert engine
+        
+        Args:
+            model_type: Model type recorded with persisted incidents
+            socketio: SocketIO instance for emitting events
+            db_service: Storage backend used to persist closed incidents
+            gap_tolerance: Normal points allowed inside an incident before it closes
+            emit_interval: Minimum seconds between anomaly events per stream
+            flush_size: Closed incidents buffered before a bulk write
+            flush_interval: Maximum seconds a closed incident waits to be written
+        """
+        self.model_type = model_type
+        self.socketio = socketio
+        self.db_service = db_service
+        self.gap_tolerance = gap_tolerance
+        self.emit_interval = emit_interval
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        
+        self.last_seen = {}
+        self.point_counts = {}
+        self.last_threshold = {}
+        self.open_incidents = {}
+        self.last_emit = {}
+        self.pending = {}
+        self.closed_incidents = []
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        
+    def set_socketio(self, socketio):
+        """Set the SocketIO instance
+        
+        Args:
+            socketio: SocketIO instance
+        """
+        self.socketio = socketio
+        
+    def process(self, stream, timestamps, values, predictions, scores, threshold=None):
+        """Process newly scored points of a stream
+        
+        Args:
+            stream: Stream identifier
+            timestamps: Timestamps of the points, in arrival order
+            values: Values of the points
+            predictions: Predictions where -1 marks an anomaly
+            scores: Anomaly scores
+            threshold: Threshold used to classify the points; the last known
+                threshold of the stream is kept if None
+        """
+        with self.lock:
+            self._emit_pending()
+            
+            if threshold is None:
+                threshold = self.last_threshold.get(stream)
+            else:
+                threshold = float(threshold)
+                self.last_threshold[stream] = threshold
+                
+            last_seen = self.last_seen.get(stream)
+            index = self.point_counts.get(stream, 0)
+            
+            for timestamp, value, prediction, score in zip(timestamps, values, predictions, scores):
+                # Skip points already processed in an earlier window
+                point_time = _to_datetime(timestamp)
+                if last_seen is not None and point_time <= last_seen:
+                    continue
+                last_seen = point_time
+                point_index = index
+                index += 1
+                
+                incident = self.open_incidents.get(stream)
+                if prediction == -1:
+                    if incident is None:
+                        self.open_incidents[stream] = Incident(
+                            stream, point_index, timestamp, float(value), float(score), threshold
+                        )
+                        INCIDENTS_OPENED.inc()
+                    else:
+                        incident.add(point_index, timestamp, float(value), float(score), threshold)
+                elif incident is not None:
+                    incident.normal_run += 1
+                    if incident.normal_run > self.gap_tolerance:
+                        self._close(stream)
+                        
+            self.last_seen[stream] = last_seen
+            self.point_counts[stream] = index
+            
+            incident = self.open_incidents.get(stream)
+            if incident is not None and incident.dirty:
+                self._emit_incident(incident)
+                
+            if self._flush_due():
+                self._flush()
+                
+    def reset_stream(self, stream):
+        """Start a stream afresh, e.g. when a recording is replayed into it
+        
+        Closes the stream's open incident and forgets its last seen
+        timestamp, so points timestamped before those of an earlier run
+        are not skipped as already processed.
+        
+        Args:
+            stream: Stream identifier
+        """
+        with self.lock:
+            if stream in self.open_incidents:
+                self._close(stream)
+            self.last_seen.pop(stream, None)
+            
+    def _close(self, stream):
+        """Close the open incident of a stream (caller holds the lock)"""
+        incident = self.open_incidents.pop(stream)
+        
+        # Clients that saw the incident get its final state, which replaces
+        # any held-back update; incidents that opened and closed between
+        # emits still get one rate-limited event
+        if incident.emitted:
+            if self.pending.get(stream, (None,))[0] is incident:
+                del self.pending[stream]
+            self._emit('incident_closed', incident.to_dict(status='closed'))
+        else:
+            self._emit_incident(incident, status='closed')
+            
+        self.closed_incidents.append(incident)
+        
+    def _rate_limited(self, stream):
+        """Whether the stream emitted an event within the last emit_interval"""
+        last = self.last_emit.get(stream)
+        return last is not None and time.monotonic() - last < self.emit_interval
+        
+    def _emit_incident(self, incident, status='open'):
+        """Emit an incident update, or hold it back while the stream is rate-limited"""
+        if not self._rate_limited(incident.stream):
+            self._send(incident, status)
+            return
+            
+        # Keep the most severe held-back update; a later update of the
+        # same incident replaces its earlier one
+        EMITS_SUPPRESSED.inc()
+        pending = self.pending.get(incident.stream)
+        if pending is None or pending[0] is incident or incident.peak_score >= pending[0].peak_score:
+            self.pending[incident.stream] = (incident, status)
+            
+    def _emit_pending(self, force=False):
+        """Send held-back updates of streams whose interval has passed (caller holds the lock)
+        
+        Args:
+            force: Send them regardless of the rate limit
+        """
+        for stream in list(self.pending):
+            if force or not self._rate_limited(stream):
+                self._send(*self.pending.pop(stream))
+                
+    def _send(self, incident, status):
+        """Emit an incident update and start the stream's rate-limit interval"""
+        self.last_emit[incident.stream] = time.monotonic()
+        incident.dirty = False
+        incident.emitted = True
+        self._emit('anomaly_detected', incident.to_dict(status))
+        ANOMALIES_EMITTED.inc()
+        
+    def _emit(self, event, payload):
+        """Emit an event through SocketIO if available"""
+        if self.socketio:
+            with EMIT_SECONDS.time():
+                self.socketio.emit(event, payload)
+                
+    def _flush_due(self):
+        """Whether buffered incidents should be written now"""
+        if not self.closed_incidents:
+            return False
+        return (len(self.closed_incidents) >= self.flush_size
+                or time.monotonic() - self.last_flush >= self.flush_interval)
+                
+    def _flush(self):
+        """Write buffered closed incidents in one batch (caller holds the lock)"""
+        incidents = self.closed_incidents
+        self.closed_incidents = []
+        self.last_flush = time.monotonic()
+        
+        if not incidents or not self.db_service:
+            return
+            
+        rows = [
+            (
+                _to_datetime(incident.start),
+                _to_datetime(incident.end),
+                incident.stream,
+                incident.peak_score,
+                incident.point_count,
+                self.model_type
+            )
+            for incident in incidents
+        ]
+        
+        try:
+            self.db_service.store_incidents(rows)
+            INCIDENTS_PERSISTED.inc(len(rows))
+        except Exception:
+            PERSIST_ERRORS.inc()
+            logger.exception("Error storing %d incidents", len(rows))
+            
+    def flush_if_due(self):
+        """Send held-back updates and write buffered incidents if due"""
+        with self.lock:
+            self._emit_pending()
+            if self._flush_due():
+                self._flush()
+                
+    def flush(self, close_open=False):
+        """Write buffered incidents now
+        
+        Args:
+            close_open: Also close and write incidents that are still open,
+                and send held-back updates regardless of the rate limit
+        """
+        with self.lock:
+            if close_open:
+                for stream in list(self.open_incidents):
+                    self._close(stream)
+            self._emit_pending(force=close_open)
+            self._flush()
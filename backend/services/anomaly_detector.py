@@ -1,32 +1,124 @@
+import logging
 import numpy as np
 import threading
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from backend.ml_models.drift_detector import DriftMonitors
 from backend.ml_models.isolation_forest import AnomalyIsolationForest
 from backend.ml_models.lstm_detector import LSTMAnomalyDetector
+from backend.ml_models.streaming_threshold import StreamingThresholds
+from backend.services.alert_engine import AlertEngine
+from backend.services.ingest_queue import IngestQueue
+from backend.services.metrics import registry
+from backend.services.storage import to_utc_datetime
+
+# Metrics
+MODEL_FIT_SECONDS = registry.histogram('model_fit_seconds', 'Model fit latency in seconds', ('model',))
+MODEL_SCORE_SECONDS = registry.histogram('model_score_seconds', 'Model predict and score latency in seconds', ('model',))
+DETECTION_SECONDS = registry.histogram('detection_seconds', 'Latency of one detection pass in seconds')
+BUFFER_DEPTH = registry.gauge('buffer_depth', 'Number of points in the detection window')
+POINTS_RECEIVED = registry.counter('points_received_total', 'Data points added to the detector')
+POINTS_DROPPED = registry.counter('points_dropped_total', 'Data points evicted from the window before being scored')
+DETECTION_ERRORS = registry.counter('detection_errors_total', 'Exceptions raised in the detection loop')
+DRIFT_DETECTED = registry.counter('drift_detected_total', 'Distribution drifts detected', ('stream',))
+MODEL_REFITS = registry.counter('model_refits_total', 'Model refits triggered by drift', ('model',))
+ENSEMBLE_SECONDS = registry.histogram('ensemble_score_seconds', 'Wall-clock latency of scoring with both models in seconds')
+
+logger = logging.getLogger(__name__)
 
 class AnomalyDetector:
     """Service for detecting anomalies in data streams"""
     
-    def __init__(self, window_size=100, model_type='isolation_forest', socketio=None):
+    def __init__(self, window_size=100, model_type='isolation_forest', socketio=None,
+                 queue_capacity=None, overflow_policy='drop_oldest', stream='default',
+                 threshold_quantile=0.95, threshold_min_samples=50, db_service=None,
+                 alert_emit_interval=1.0, alert_gap_tolerance=0, drift_threshold=10.0,
+                 ensemble_weights=None, drift_max_burst=20,
+                 drift_warmup_samples=None):
         """Initialize the anomaly detector service
         
         Args:
             window_size: Size of the sliding window for detection
-            model_type: Type of anomaly detection model ('isolation_forest' or 'lstm')
+            model_type: Type of anomaly detection model ('isolation_forest', 'lstm'
+                or 'ensemble')
             socketio: SocketIO instance for emitting events
+            queue_capacity: Capacity of the ingest queue (defaults to 10 windows)
+            overflow_policy: Ingest queue overflow policy ('block', 'drop_oldest' or 'sample')
+            stream: Identifier of the data stream handled by this detector
+            threshold_quantile: Score quantile used as the streaming threshold
+            threshold_min_samples: Scores needed before the streaming threshold is used
+            db_service: Storage backend used to persist anomaly incidents
+            alert_emit_interval: Minimum seconds between anomaly events
+            alert_gap_tolerance: Normal points allowed inside an incident before it closes
+            drift_threshold: Page-Hinkley threshold, in reference standard deviations
+            ensemble_weights: Dict of fusion weights per model for 'ensemble'
+                (defaults to equal weights)
+            drift_max_burst: Longest run of anomalous points kept out of drift
+                monitoring as an incident
+            drift_warmup_samples: Scores the drift reference is learned from
+                (defaults to one window, at least 50)
         """
         self.window_size = window_size
         self.model_type = model_type
         self.socketio = socketio
+        self.stream = stream
         
-        # Initialize data buffer
+        # Initialize ingest queue and data buffer
+        self.ingest_queue = IngestQueue(
+            capacity=queue_capacity or window_size * 10,
+            policy=overflow_policy
+        )
         self.data_buffer = deque(maxlen=window_size)
+        self.timestamp_buffer = deque(maxlen=window_size)
+        
+        # Points added since the last detection pass
+        self.unscored_count = 0
         
         # Initialize models
         self.isolation_forest = AnomalyIsolationForest(contamination=0.05)
         self.lstm_detector = LSTMAnomalyDetector(seq_length=10, n_features=1)
         
+        # Streaming score thresholds, per model since score scales differ
+        self.thresholds = {
+            name: StreamingThresholds(quantile=threshold_quantile, min_samples=threshold_min_samples)
+            for name in ('isolation_forest', 'lstm', 'ensemble')
+        }
+        
+        # Ensemble scoring; each model runs in its own thread since both
+        # release the GIL in their numeric kernels
+        self.threshold_quantile = threshold_quantile
+        self.ensemble_weights = ensemble_weights or {'isolation_forest': 0.5, 'lstm': 0.5}
+        self.ensemble_executor = None
+        self.last_model_latencies = {}
+        
+        # Drift monitoring on the model's scores; after a drift the model is
+        # refitted once the window holds only points that arrived after it.
+        # The reference spans a window, so it covers the seasonality the
+        # model was fitted on
+        self.drift_monitors = DriftMonitors(
+            threshold=drift_threshold,
+            max_burst=drift_max_burst,
+            warmup_samples=drift_warmup_samples or max(window_size, 50)
+        )
+        self.points_until_refit = None
+        self.last_drift = None
+        self.refit_count = 0
+        
+        # Initialize alert engine
+        self.alert_engine = AlertEngine(
+            model_type,
+            socketio=socketio,
+            db_service=db_service,
+            gap_tolerance=alert_gap_tolerance,
+            emit_interval=alert_emit_interval
+        )
+        
+        # Timestamps and new point count of the last detection pass
+        self.last_timestamps = []
+        self.last_new_count = 0
+        
         # Initialize detection thread
         self.detection_thread = None
         self.stop_detection = False
@@ -38,15 +130,94 @@ class AnomalyDetector:
             socketio: SocketIO instance
         """
         self.socketio = socketio
+        self.alert_engine.set_socketio(socketio)
+        
+    def add_data_point(self, value, timestamp=None):
+        """Queue a data point for detection
         
-    def add_data_point(self, value):
-        """Add a data point to the buffer
+        Timestamps are normalized to aware UTC datetimes, so points from
+        clients that send offsets, 'Z' suffixes or epoch seconds can be
+        compared with each other and with the naive UTC default.
         
         Args:
             value: Numeric value of the data point
+            timestamp: ISO format timestamp, epoch seconds or datetime
+                (defaults to now)
+            
+        Returns:
+            True if the point was queued, False if it was shed
+            
+        Raises:
+            ValueError: If the timestamp cannot be parsed
         """
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc)
+        else:
+            timestamp = to_utc_datetime(timestamp)
+            
+        POINTS_RECEIVED.inc()
+        return self.ingest_queue.put((timestamp, value))
+        
+    def _drain_queue(self):
+        """Move queued points into the detection window
+        
+        At most one window of points is moved per call, so every point is
+        still in the window when the next detection pass scores it.
+        """
+        for timestamp, value in self.ingest_queue.get_batch(self.window_size):
+            self._append_to_window(timestamp, value)
+            
+    def _append_to_window(self, timestamp, value):
+        """Append a data point to the detection window
+        
+        Args:
+            timestamp: Timestamp of the data point
+            value: Numeric value of the data point
+        """
+        # A full window evicts its oldest point; count it if it was never scored
+        if len(self.data_buffer) == self.window_size and self.unscored_count >= self.window_size:
+            POINTS_DROPPED.inc()
+            
         self.data_buffer.append(value)
+        self.timestamp_buffer.append(timestamp)
+        self.unscored_count += 1
+        BUFFER_DEPTH.set(len(self.data_buffer))
         
+        if self.points_until_refit:
+            self.points_until_refit -= 1
+            
+    def _update_drift(self, timestamps, scores, predictions):
+        """Feed the scores of newly scored points to the stream's drift monitor
+        
+        Runs after scoring so the monitor can hold back points the model
+        flagged, which keeps short incidents from reading as drift. Scores
+        are monitored rather than values, so a shift is drift only if the
+        fitted model finds the data less typical. While a refit is pending
+        the drift has been detected already, and the monitor restarts once
+        the model is refitted.
+        
+        Args:
+            timestamps: Timestamps of the new points
+            scores: Anomaly scores of the new points, NaN where the model
+                has no output
+            predictions: Predictions where -1 marks an anomaly
+        """
+        if self.points_until_refit is not None:
+            return
+            
+        monitor = self.drift_monitors.get(self.stream)
+        for i, (timestamp, score, prediction) in enumerate(zip(timestamps, scores, predictions)):
+            if np.isnan(score):
+                continue
+                
+            if monitor.update(score, is_anomaly=prediction == -1):
+                DRIFT_DETECTED.labels(self.stream).inc()
+                self.last_drift = timestamp.isoformat()
+                
+                # Points after the drift point are already in the window
+                self.points_until_refit = max(self.window_size - (len(scores) - 1 - i), 0)
+                return
+                
     def _get_model(self):
         """Get the selected anomaly detection model
         
@@ -57,88 +228,355 @@ class AnomalyDetector:
             return self.isolation_forest
         elif self.model_type == 'lstm':
             return self.lstm_detector
+        elif self.model_type == 'ensemble':
+            raise ValueError("The ensemble has no single model; use _get_models")
         else:
             raise ValueError(f"Unknown model type: {self.model_type}")
+            
+    def _get_models(self):
+        """Get the models used by the selected model type
+        
+        Returns:
+            Dict of model instances keyed by model type
+        """
+        if self.model_type == 'ensemble':
+            return {'isolation_forest': self.isolation_forest, 'lstm': self.lstm_detector}
+        return {self.model_type: self._get_model()}
+        
+    def _get_threshold(self):
+        """Get the streaming threshold for the current model and stream
+        
+        Returns:
+            StreamingThreshold instance
+        """
+        return self.thresholds[self.model_type].get(self.stream)
+    
+    def current_threshold(self):
+        """Get the threshold currently used to flag anomalies
+        
+        Returns:
+            Streaming threshold once warmed up, otherwise the model's own
+            threshold (None if it has none)
+        """
+        threshold = self._get_threshold().value
+        if threshold is None and self.model_type == 'ensemble':
+            threshold = self.threshold_quantile
+        elif threshold is None:
+            threshold = getattr(self._get_model(), 'threshold', None)
+        return None if threshold is None else float(threshold)
+    
+    def threshold_state(self):
+        """Serialize the streaming thresholds for merging into another worker
+        
+        Returns:
+            Dict keyed by model type, then stream
+        """
+        return {name: thresholds.to_dict() for name, thresholds in self.thresholds.items()}
+    
+    def merge_threshold_state(self, state):
+        """Merge streaming thresholds from another worker
+        
+        Args:
+            state: Dict produced by another detector's threshold_state
+        """
+        for name, streams in state.items():
+            self.thresholds[name].merge_state(streams)
+            
+    @staticmethod
+    def _align_to_points(values, n_points, fill):
+        """Align per-sequence model output with the points it ends on
+        
+        The LSTM yields one value per sequence, i.e. seq_length - 1 fewer
+        than points; those leading points are filled in.
+        
+        Args:
+            values: Per-point or per-sequence model output
+            n_points: Number of points scored
+            fill: Value for points without output
+            
+        Returns:
+            numpy array of length n_points
+        """
+        values = np.asarray(values, dtype=float)
+        if len(values) == n_points:
+            return values
+            
+        aligned = np.full(n_points, fill, dtype=float)
+        aligned[n_points - len(values):] = values
+        return aligned
     
     def detect_anomalies(self, data=None):
         """Detect anomalies in the data
         
         Args:
-            data: numpy array of data points (uses buffer if None)
+            data: numpy array of data points (uses buffer if None); only the
+                scores of buffered points are fed to drift monitoring
             
         Returns:
             Tuple of (data, predictions, scores)
         """
         # Use provided data or buffer
-        if data is None:
+        from_buffer = data is None
+        if from_buffer:
+            self._drain_queue()
             if len(self.data_buffer) < 10:  # Need enough data
                 return None, None, None
             data = np.array(list(self.data_buffer))
+            new_count = min(self.unscored_count, len(data))
+            self.unscored_count = 0
+            self.last_timestamps = list(self.timestamp_buffer)
+            self.last_new_count = new_count
+        else:
+            new_count = len(data)
         
-        # Get the model
+        # Refit once the window has been replaced by post-drift points
+        if self.points_until_refit == 0:
+            self.points_until_refit = None
+            self._refit(data)
+            
+        if self.model_type == 'ensemble':
+            predictions, scores = self._score_ensemble(data, new_count)
+        else:
+            predictions, scores = self._score_single(data, new_count)
+            
+        if from_buffer:
+            new_points = slice(len(data) - new_count, None)
+            self._update_drift(self.last_timestamps[new_points], scores[new_points], predictions[new_points])
+            
+        return data, predictions, scores
+        
+    def _score_single(self, data, new_count):
+        """Score data with the selected model
+        
+        Args:
+            data: numpy array of data points
+            new_count: Number of trailing points not scored before
+            
+        Returns:
+            Tuple of (predictions, scores) aligned with data
+        """
         model = self._get_model()
         
         # Fit the model if not fitted
         if not model.is_fitted:
-            model.fit(data)
+            with MODEL_FIT_SECONDS.labels(self.model_type).time():
+                model.fit(data)
             
         # Get predictions and scores
-        predictions = model.predict(data)
-        scores = model.anomaly_score(data)
+        with MODEL_SCORE_SECONDS.labels(self.model_type).time():
+            predictions = model.predict(data)
+            scores = model.anomaly_score(data)
+            
+        predictions = self._align_to_points(predictions, len(data), fill=1)
+        scores = self._align_to_points(scores, len(data), fill=np.nan)
         
-        return data, predictions, scores
-    
-    def _detection_loop(self, interval=1.0):
-        """Run continuous anomaly detection
+        # Classify against the streaming threshold once it has warmed up,
+        # then fold in the scores of points not seen by earlier passes
+        threshold = self._get_threshold()
+        dynamic_predictions = threshold.predict(scores)
+        if dynamic_predictions is not None:
+            predictions = dynamic_predictions
+        threshold.update(scores[len(scores) - new_count:])
+        
+        return predictions, scores
+        
+    def _score_model(self, name, model, data):
+        """Fit if needed and score data with one model of the ensemble
         
         Args:
-            interval: Seconds between detection runs
+            name: Model type
+            model: Model instance
+            data: numpy array of data points
+            
+        Returns:
+            Raw anomaly scores aligned with data
         """
-        # Reset stop flag
-        self.stop_detection = False
+        start = time.perf_counter()
         
-        while not self.stop_detection:
-            # Skip if not enough data
-            if len(self.data_buffer) < 10:
-                time.sleep(interval)
-                continue
+        if not model.is_fitted:
+            with MODEL_FIT_SECONDS.labels(name).time():
+                model.fit(data)
                 
-            # Run detection
-            data, predictions, scores = self.detect_anomalies()
+        with MODEL_SCORE_SECONDS.labels(name).time():
+            scores = model.anomaly_score(data)
             
-            # Skip if detection failed
-            if data is None or predictions is None:
-                time.sleep(interval)
+        self.last_model_latencies[name] = time.perf_counter() - start
+        return self._align_to_points(scores, len(data), fill=np.nan)
+        
+    def _calibrate(self, name, scores):
+        """Map raw scores of one model to quantiles in [0, 1]
+        
+        Scores are looked up in the model's streaming score sketch; until
+        that has warmed up they are ranked within the window instead.
+        
+        Args:
+            name: Model type
+            scores: Raw anomaly scores, NaN where the model has no output
+            
+        Returns:
+            numpy array of calibrated scores, NaN where scores are NaN
+        """
+        threshold = self.thresholds[name].get(self.stream)
+        if threshold.is_ready:
+            return threshold.digest.cdf_many(scores)
+            
+        calibrated = np.full(len(scores), np.nan)
+        valid = ~np.isnan(scores)
+        n_valid = int(valid.sum())
+        if n_valid:
+            ranks = np.argsort(np.argsort(scores[valid]))
+            calibrated[valid] = (ranks + 0.5) / n_valid
+        return calibrated
+        
+    def _score_ensemble(self, data, new_count):
+        """Score data with both models concurrently and fuse the scores
+        
+        Each model's scores are calibrated to quantiles of its own score
+        distribution, which puts them on a common scale, and combined as a
+        weighted mean. Points only one model has output for (the leading
+        points of an LSTM window) use that model alone.
+        
+        Args:
+            data: numpy array of data points
+            new_count: Number of trailing points not scored before
+            
+        Returns:
+            Tuple of (predictions, fused scores) aligned with data
+        """
+        # Keep a local reference; stop() may shut the pool down meanwhile
+        executor = self.ensemble_executor
+        if executor is None:
+            executor = self.ensemble_executor = ThreadPoolExecutor(
+                max_workers=len(self.ensemble_weights),
+                thread_name_prefix='ensemble'
+            )
+            
+        models = self._get_models()
+        with ENSEMBLE_SECONDS.time():
+            futures = {
+                name: executor.submit(self._score_model, name, models[name], data)
+                for name in self.ensemble_weights
+            }
+            raw_scores = {name: future.result() for name, future in futures.items()}
+            
+        weighted_sum = np.zeros(len(data))
+        weight_total = np.zeros(len(data))
+        new_points = slice(len(data) - new_count, None)
+        
+        for name, scores in raw_scores.items():
+            calibrated = self._calibrate(name, scores)
+            self.thresholds[name].get(self.stream).update(scores[new_points])
+            
+            valid = ~np.isnan(calibrated)
+            weighted_sum[valid] += self.ensemble_weights[name] * calibrated[valid]
+            weight_total[valid] += self.ensemble_weights[name]
+            
+        fused = np.full(len(data), np.nan)
+        covered = weight_total > 0
+        fused[covered] = weighted_sum[covered] / weight_total[covered]
+        
+        # Until the fused scores have their own threshold, flag points
+        # above the target quantile
+        threshold = self._get_threshold()
+        predictions = threshold.predict(fused)
+        if predictions is None:
+            predictions = np.where(fused > self.threshold_quantile, -1, 1)
+        threshold.update(fused[new_points])
+        
+        return predictions, fused
+        
+    def _refit(self, data):
+        """Refit the models after drift and restart their streaming thresholds
+        
+        Models that have not been fitted yet are left to the normal first fit.
+        
+        Args:
+            data: Window of post-drift data
+        """
+        refitted = False
+        for name, model in self._get_models().items():
+            if not model.is_fitted:
                 continue
                 
-            # Find anomalies
-            anomaly_indices = np.where(predictions == -1)[0]
-            
-            # Emit results if anomalies found
-            if len(anomaly_indices) > 0 and self.socketio:
-                # Get most recent anomaly
-                latest_idx = anomaly_indices[-1]
-                latest_score = float(scores[latest_idx])
+            with MODEL_FIT_SECONDS.labels(name).time():
+                model.fit(data)
                 
-                # Emit anomaly event
-                self.socketio.emit('anomaly_detected', {
-                    'index': int(latest_idx),
-                    'value': float(data[latest_idx]),
-                    'score': latest_score,
-                    'threshold': self.isolation_forest.threshold if self.model_type == 'isolation_forest' else self.lstm_detector.threshold
-                })
-                
-            # Short delay
-            time.sleep(interval)
+            # Scores of the refitted model are on a new scale
+            self.thresholds[name].reset(self.stream)
+            MODEL_REFITS.labels(name).inc()
+            refitted = True
+            
+        if refitted:
+            self.thresholds[self.model_type].reset(self.stream)
+            self.drift_monitors.get(self.stream).reset()
+            self.refit_count += 1
+        
+    def drift_state(self):
+        """Get the drift monitoring state
+        
+        Returns:
+            JSON-serializable dict with per-stream detector state, refit
+            status and the seconds each model took in the last ensemble pass
+        """
+        return {
+            'streams': self.drift_monitors.state(),
+            'last_drift': self.last_drift,
+            'refit_pending': self.points_until_refit is not None,
+            'points_until_refit': self.points_until_refit,
+            'refit_count': self.refit_count,
+            'model_latencies': dict(self.last_model_latencies)
+        }
+        
+    def _detection_loop(self, interval=1.0):
+        """Run anomaly detection whenever new points arrive
+        
+        Args:
+            interval: Maximum seconds to wait for new points
+        """
+        # Reset stop flag
+        self.stop_detection = False
+        
+        while not self.stop_detection:
+            # Errors are counted and the loop carries on; one bad point or
+            # a failed emit must not end detection for the stream
+            try:
+                # Wait for new points instead of polling on a fixed sleep
+                if not self.ingest_queue.wait(timeout=interval):
+                    self.alert_engine.flush_if_due()
+                    continue
+                    
+                # Run detection
+                with DETECTION_SECONDS.time():
+                    data, predictions, scores = self.detect_anomalies()
+                    
+                # Skip if not enough data yet
+                if data is None or predictions is None:
+                    continue
+                    
+                # Hand only the newly arrived points to the alert engine, which
+                # merges them into incidents and rate-limits events
+                new_points = slice(len(data) - self.last_new_count, None)
+                self.alert_engine.process(
+                    self.stream,
+                    self.last_timestamps[new_points],
+                    data[new_points],
+                    predictions[new_points],
+                    scores[new_points],
+                    self.current_threshold()
+                )
+            except Exception:
+                DETECTION_ERRORS.inc()
+                logger.exception("Error detecting anomalies")
+                time.sleep(interval)
     
     def start_detection(self, interval=1.0):
         """Start anomaly detection in a background thread
         
         Args:
-            interval: Seconds between detection runs
+            interval: Maximum seconds to wait for new points
         """
         # Stop any existing detection
-        self.stop_detection = True
+        self.stop()
         if self.detection_thread and self.detection_thread.is_alive():
             self.detection_thread.join(timeout=1.0)
             
@@ -152,4 +590,11 @@ class AnomalyDetector:
         
     def stop(self):
         """Stop the anomaly detection"""
-        self.stop_detection = True
\ No newline at end of file
+        self.stop_detection = True
+        self.ingest_queue.wake()
+        self.alert_engine.flush(close_open=True)
+        
+        # Release the ensemble's scoring threads; a later pass starts a new pool
+        executor, self.ensemble_executor = self.ensemble_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
\ No newline at end of file
@@ -0,0 +1,310 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from backend.ml_models.isolation_forest import AnomalyIsolationForest
+from backend.services.metrics import registry
+from backend.services.storage import from_epoch_micros
+
+# Metrics
+BACKFILL_POINTS = registry.counter('backfill_points_total', 'Data points re-scored by backfill jobs')
+BACKFILL_ANOMALIES = registry.counter('backfill_anomalies_total', 'Anomalies written by backfill jobs')
+BACKFILL_BATCH_SECONDS = registry.histogram('backfill_batch_seconds', 'Latency of scoring one backfill batch in seconds')
+
+# Model used by a pool worker, set by _init_worker
+_worker_model = None
+
+
+def _model_payload(model):
+    """Build a picklable description of a fitted model
+    
+    Keras models do not pickle, so the LSTM is shipped as its weights and
+    rebuilt in the worker.
+    
+    Args:
+        model: Fitted AnomalyIsolationForest or LSTMAnomalyDetector
+        
+    Returns:
+        Tuple understood by _init_worker
+    """
+    if isinstance(model, AnomalyIsolationForest):
+        return ('isolation_forest', model)
+        
+    return ('lstm', {
+        'seq_length': model.seq_length,
+        'n_features': model.n_features,
+        'weights': model.model.get_weights(),
+        'threshold': model.threshold
+    })
+
+
+def _load_model(payload):
+    """Rebuild a model from a payload built by _model_payload"""
+    kind, state = payload
+    if kind == 'isolation_forest':
+        return state
+        
+    from backend.ml_models.lstm_detector import LSTMAnomalyDetector
+    model = LSTMAnomalyDetector(seq_length=state['seq_length'], n_features=state['n_features'])
+    model.model.set_weights(state['weights'])
+    model.threshold = state['threshold']
+    model.is_fitted = True
+    return model
+
+
+def _init_worker(payload):
+    """Load the model once per pool worker"""
+    global _worker_model
+    _worker_model = _load_model(payload)
+
+
+def _score_batch(values, context_length):
+    """Score a batch of values in a pool worker
+    
+    Args:
+        values: 1D numpy array of context values followed by batch values
+        context_length: Number of leading values that only provide context
+        
+    Returns:
+        Tuple of (predictions, scores) for the batch values only; points
+        the model produced no output for are normal with a NaN score
+    """
+    predictions = np.asarray(_worker_model.predict(values), dtype=float)
+    scores = np.asarray(_worker_model.anomaly_score(values), dtype=float)
+    
+    # Per-sequence output (LSTM) ends on the last point of each sequence
+    missing = len(values) - len(scores)
+    if missing:
+        predictions = np.concatenate([np.ones(missing), predictions])
+        scores = np.concatenate([np.full(missing, np.nan), scores])
+        
+    return predictions[context_length:], scores[context_length:]
+
+
+class _InlineExecutor:
+    """Executor that runs work in the calling process"""
+    
+    def __init__(self, payload):
+        """Load the model into this process"""
+        _init_worker(payload)
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc, tb):
+        return False
+        
+    def submit(self, fn, *args):
+        """Run fn immediately and wrap its result in a Future"""
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class BackfillJob:
+    """Re-scores stored data points and writes the anomalies found
+    
+    Data points are streamed from storage in time order as column arrays,
+    split into batches scored across a process pool, and written back in
+    bulk. A checkpoint is committed with every batch of anomalies, so a
+    job that is restarted with the same job_id resumes where it stopped;
+    a sequence model then gets the points up to the checkpoint as history,
+    so the first points after it are scored as in an uninterrupted run.
+    
+    An unfitted model is fitted on the first chunk of the range, also on
+    resume, so restarts use the same training data. The Isolation Forest
+    is seeded and comes out identical; LSTM training is not, so pass a
+    fitted LSTM to keep scores identical across restarts.
+    """
+    
+    def __init__(self, db_service, job_id, model, model_tag=None, chunk_size=10000,
+                 batch_size=2000, workers=None, max_pending=None):
+        """Initialize the backfill job
+        
+        Args:
+            db_service: Storage backend to read from and write to
+            job_id: Identifier used for checkpoints
+            model: AnomalyIsolationForest or LSTMAnomalyDetector; fitted on
+                the first chunk of the range if not already fitted, also when
+                resuming, so a resumed job fits on the same data
+            model_tag: Value stored in anomalies.model_type (defaults to the
+                model type)
+            chunk_size: Rows fetched from the server-side cursor at a time
+            batch_size: Points per scoring task
+            workers: Pool size; 0 scores in the calling process
+            max_pending: Maximum batches in flight (defaults to 2 per worker)
+        """
+        self.db_service = db_service
+        self.job_id = job_id
+        self.model = model
+        self.model_type = 'isolation_forest' if isinstance(model, AnomalyIsolationForest) else 'lstm'
+        self.model_tag = model_tag or self.model_type
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending or max(2, 2 * self.workers)
+        
+        # Points of history each batch needs in front of it
+        self.context_size = getattr(model, 'seq_length', 1) - 1
+        
+        self.stats = {'points': 0, 'anomalies': 0, 'batches': 0}
+        
+    def _make_executor(self, payload):
+        """Create the executor used for scoring"""
+        if self.workers == 0:
+            return _InlineExecutor(payload)
+            
+        # Spawn rather than fork so TensorFlow state is not inherited
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(payload,)
+        )
+        
+    def _complete(self, ids, timestamps, submitted, future):
+        """Write the anomalies of a finished batch and checkpoint it
+        
+        Args:
+            ids: Array of point IDs of the batch
+            timestamps: Array of int64 epoch microseconds of the batch
+            submitted: perf_counter value when the batch was submitted
+            future: Future resolving to (predictions, scores)
+        """
+        predictions, scores = future.result()
+        BACKFILL_BATCH_SECONDS.observe(time.perf_counter() - submitted)
+        
+        # Only anomalous rows are converted to Python objects
+        anomalies = [
+            (from_epoch_micros(timestamps[i]), int(ids[i]), float(scores[i]), self.model_tag)
+            for i in np.flatnonzero(predictions == -1)
+        ]
+        checkpoint = (self.job_id, from_epoch_micros(timestamps[-1]), int(ids[-1]))
+        self.db_service.store_anomalies(anomalies, checkpoint=checkpoint)
+        
+        self.stats['points'] += len(ids)
+        self.stats['anomalies'] += len(anomalies)
+        self.stats['batches'] += 1
+        BACKFILL_POINTS.inc(len(ids))
+        BACKFILL_ANOMALIES.inc(len(anomalies))
+        
+    def _first_chunk(self, start, end):
+        """Read the first chunk of the range, ignoring any checkpoint
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            
+        Returns:
+            Tuple of (ids, timestamps, values) arrays, or None for an empty range
+        """
+        chunks = self.db_service.iter_point_arrays(start=start, end=end, chunk_size=self.chunk_size)
+        try:
+            return next(chunks, None)
+        finally:
+            chunks.close()
+            
+    def run(self, start=None, end=None, resume=True):
+        """Run the backfill
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            resume: Continue from this job's checkpoint if one exists
+            
+        Returns:
+            Dict with counts of points, anomalies and batches processed
+        """
+        after = self.db_service.get_backfill_checkpoint(self.job_id) if resume else None
+        chunks = self.db_service.iter_point_arrays(start=start, end=end, after=after, chunk_size=self.chunk_size)
+        
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            return self.stats
+            
+        # Fit on the oldest data if the model has not been trained yet
+        if not self.model.is_fitted:
+            fit_chunk = first_chunk if after is None else self._first_chunk(start, end)
+            self.model.fit(np.asarray(fit_chunk[2], dtype=float))
+            
+        # History in front of the first batch; on resume, the points up to
+        # and including the checkpoint
+        context = np.empty(0)
+        if after is not None and self.context_size:
+            context = self.db_service.get_point_arrays_before(after, self.context_size, start=start)[2]
+            
+        pending = deque()
+        
+        with self._make_executor(_model_payload(self.model)) as executor:
+            for ids, timestamps, chunk_values in itertools.chain([first_chunk], chunks):
+                for i in range(0, len(ids), self.batch_size):
+                    batch = slice(i, i + self.batch_size)
+                    values = chunk_values[batch]
+                    if self.context_size:
+                        values = np.concatenate([context, values])
+                        context = values[-self.context_size:]
+                        
+                    future = executor.submit(_score_batch, values, len(values) - len(ids[batch]))
+                    pending.append((ids[batch], timestamps[batch], time.perf_counter(), future))
+                    
+                    # Results are written in order so checkpoints stay contiguous
+                    while len(pending) > self.max_pending:
+                        self._complete(*pending.popleft())
+                        
+            while pending:
+                self._complete(*pending.popleft())
+                
+        return self.stats
+
+
+def main(argv=None):
+    """Run a backfill job from the command line"""
+    import backend.config as config
+    from backend.services.storage import create_storage
+    
+    parser = argparse.ArgumentParser(description='Re-score stored data points')
+    parser.add_argument('--job-id', required=True, help='Checkpoint identifier; rerun to resume')
+    parser.add_argument('--start', type=datetime.fromisoformat, default=None, help='Inclusive ISO start time')
+    parser.add_argument('--end', type=datetime.fromisoformat, default=None, help='Exclusive ISO end time')
+    parser.add_argument('--model-type', choices=('isolation_forest', 'lstm'), default=config.DEFAULT_MODEL_TYPE)
+    parser.add_argument('--model-tag', default=None, help='Value stored in anomalies.model_type')
+    parser.add_argument('--workers', type=int, default=None, help='Pool size; 0 scores in-process')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    parser.add_argument('--no-resume', action='store_true', help='Ignore any saved checkpoint')
+    args = parser.parse_args(argv)
+    
+    if args.model_type == 'lstm':
+        from backend.ml_models.lstm_detector import LSTMAnomalyDetector
+        model = LSTMAnomalyDetector(seq_length=10, n_features=1)
+    else:
+        model = AnomalyIsolationForest(contamination=0.05)
+        
+    db_service = create_storage(
+        config.STORAGE_BACKEND,
+        postgres_url=config.POSTGRES_URL,
+        path=config.COLUMNAR_STORAGE_PATH
+    )
+    try:
+        job = BackfillJob(
+            db_service, args.job_id, model,
+            model_tag=args.model_tag,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            workers=args.workers
+        )
+        stats = job.run(start=args.start, end=args.end, resume=not args.no_resume)
+        print(f"Backfill {args.job_id}: {stats}")
+    finally:
+        db_service.close()
+
+
+if __name__ == '__main__':
+    main()
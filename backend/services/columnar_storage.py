@@ -0,0 +1,708 @@
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backend.services.metrics import registry
+from backend.services.storage import StorageBackend, from_epoch_micros, parse_timestamp, to_epoch_micros
+
+# Metrics
+COLUMNAR_WRITE_SECONDS = registry.histogram('columnar_write_seconds', 'Columnar storage append latency in seconds')
+
+# Column files of a partition and their dtypes
+COLUMNS = (
+    ('timestamp', 'timestamp.i8', np.int64),
+    ('value', 'value.f8', np.float64),
+    ('flags', 'flags.u1', np.uint8)
+)
+INDEX_FILE = 'sparse_index.i8'
+UNSORTED_MARKER = 'UNSORTED'
+LAYOUT_FILE = 'layout.json'
+PARTITION_FORMAT = '%Y%m%dT%H%M%S'
+
+# Bits of the flags column
+FLAG_ANOMALY = 1
+
+
+class _Partition:
+    """One time partition: an append-only file per column plus a sparse index
+    
+    The sparse index holds the timestamp of every index_interval-th row,
+    so a range lookup only binary-searches (and pages in) the blocks that
+    can contain the range.
+    """
+    
+    def __init__(self, path, index_interval):
+        """Open or create a partition directory
+        
+        Args:
+            path: Partition directory
+            index_interval: Rows between sparse index entries
+        """
+        self.path = path
+        self.index_interval = index_interval
+        os.makedirs(path, exist_ok=True)
+        
+        self.handles = {}
+        self.maps = {}
+        
+        # Row count comes from the timestamp column, which is written first
+        timestamp_path = self._file('timestamp.i8')
+        self.rows = os.path.getsize(timestamp_path) // 8 if os.path.exists(timestamp_path) else 0
+        self.sorted = not os.path.exists(self._file(UNSORTED_MARKER))
+        self.last_timestamp = int(self.column('timestamp')[-1]) if self.rows else None
+        
+    def _file(self, name):
+        """Path of a file in the partition"""
+        return os.path.join(self.path, name)
+        
+    def append(self, timestamps, values, flags):
+        """Append rows to every column
+        
+        Args:
+            timestamps: int64 array of epoch microseconds
+            values: float64 array of values
+            flags: uint8 array of flag bits
+        """
+        if not self.handles:
+            for _, filename, _ in COLUMNS:
+                self.handles[filename] = open(self._file(filename), 'ab')
+            self.handles[INDEX_FILE] = open(self._file(INDEX_FILE), 'ab')
+            
+        # Out-of-order rows disable the binary-search path for this partition
+        if self.sorted and (
+            (self.last_timestamp is not None and timestamps[0] < self.last_timestamp)
+            or np.any(np.diff(timestamps) < 0)
+        ):
+            self.sorted = False
+            open(self._file(UNSORTED_MARKER), 'w').close()
+            
+        for (_, filename, dtype), column in zip(COLUMNS, (timestamps, values, flags)):
+            self.handles[filename].write(np.ascontiguousarray(column, dtype=dtype).tobytes())
+            
+        # Index the rows that start a new block
+        first = -self.rows % self.index_interval
+        self.handles[INDEX_FILE].write(timestamps[first::self.index_interval].astype(np.int64).tobytes())
+        
+        self.rows += len(timestamps)
+        self.last_timestamp = int(timestamps[-1]) if self.last_timestamp is None else max(self.last_timestamp, int(timestamps[-1]))
+        self.maps = {}
+        
+    def flush(self):
+        """Flush buffered writes so memory maps see them"""
+        for handle in self.handles.values():
+            handle.flush()
+            
+    def close(self):
+        """Close the column files"""
+        for handle in self.handles.values():
+            handle.close()
+        self.handles = {}
+        self.maps = {}
+        
+    def snapshot(self):
+        """Flush and map every column at the current row count
+        
+        The caller must hold the storage lock, so no append can advance
+        the row count past what has been flushed. The returned maps stay
+        valid after later appends.
+        
+        Returns:
+            Tuple of (sorted, columns) where columns maps 'timestamp',
+            'value', 'flags' and 'index' to arrays
+        """
+        self.flush()
+        columns = {name: self.column(name) for name in ('timestamp', 'value', 'flags', 'index')}
+        return self.sorted, columns
+        
+    def column(self, name):
+        """Memory-map a column (read-only, zero-copy)
+        
+        Args:
+            name: 'timestamp', 'value', 'flags' or 'index'
+            
+        Returns:
+            numpy memmap, or an empty array for an empty partition
+        """
+        if name in self.maps:
+            return self.maps[name]
+            
+        if name == 'index':
+            filename, dtype = INDEX_FILE, np.int64
+            length = (self.rows + self.index_interval - 1) // self.index_interval
+        else:
+            filename, dtype = next((f, d) for n, f, d in COLUMNS if n == name)
+            length = self.rows
+            
+        if length == 0:
+            array = np.empty(0, dtype=dtype)
+        else:
+            array = np.memmap(self._file(filename), dtype=dtype, mode='r', shape=(length,))
+        self.maps[name] = array
+        return array
+        
+    def row_bounds(self, start, end, columns=None):
+        """Find the rows of a sorted partition inside [start, end)
+        
+        Args:
+            start: Inclusive epoch microseconds, or None
+            end: Exclusive epoch microseconds, or None
+            columns: Columns from snapshot (maps the current columns if None)
+            
+        Returns:
+            Tuple of (first_row, stop_row)
+        """
+        timestamps = columns['timestamp'] if columns else self.column('timestamp')
+        index = columns['index'] if columns else self.column('index')
+        rows = len(timestamps)
+        
+        lo, hi = 0, rows
+        if start is not None:
+            block = max(int(np.searchsorted(index, start, side='left')) - 1, 0)
+            lo = block * self.index_interval
+        if end is not None:
+            block = int(np.searchsorted(index, end, side='left'))
+            hi = min(block * self.index_interval, rows)
+            
+        # Exact search within the candidate blocks only
+        window = timestamps[lo:hi]
+        first = lo + (int(np.searchsorted(window, start, side='left')) if start is not None else 0)
+        stop = lo + (int(np.searchsorted(window, end, side='left')) if end is not None else len(window))
+        return first, stop
+
+
+class ColumnarStorage(StorageBackend):
+    """Embedded storage on memory-mapped, append-only column files
+    
+    Data points are split into time partitions, each holding one file per
+    column (timestamp int64 microseconds, value float64, flags uint8) and
+    a sparse time index. Reads memory-map the columns, so a range that
+    falls in one partition is returned without copying. Anomalies,
+    incidents and backfill checkpoints are low volume and kept as
+    newline-delimited JSON next to the partitions.
+    """
+    
+    def __init__(self, path, partition_seconds=None, index_interval=None):
+        """Open or create a storage directory
+        
+        Point IDs and the sparse index depend on the partition span and
+        index interval, so both are saved with the data and reused when
+        the directory is reopened.
+        
+        Args:
+            path: Root directory
+            partition_seconds: Time span of one partition (default one day)
+            index_interval: Rows between sparse index entries (default 1024)
+        """
+        self.path = path
+        self.data_path = os.path.join(path, 'data_points')
+        self.anomalies_path = os.path.join(path, 'anomalies.ndjson')
+        self.checkpoints_path = os.path.join(path, 'checkpoints.json')
+        os.makedirs(self.data_path, exist_ok=True)
+        
+        layout = self._load_layout(partition_seconds, index_interval)
+        self.partition_seconds = layout['partition_seconds']
+        self.partition_micros = self.partition_seconds * 1_000_000
+        self.index_interval = layout['index_interval']
+        
+        self.lock = threading.RLock()
+        self.partitions = {}
+        for name in os.listdir(self.data_path):
+            key = to_epoch_micros(datetime.strptime(name, PARTITION_FORMAT).replace(tzinfo=timezone.utc))
+            self.partitions[key] = _Partition(os.path.join(self.data_path, name), self.index_interval)
+            
+        self.anomaly_count = 0
+        if os.path.exists(self.anomalies_path):
+            with open(self.anomalies_path) as f:
+                self.anomaly_count = sum(1 for _ in f)
+        self.anomalies_file = None
+        
+    def _load_layout(self, partition_seconds, index_interval):
+        """Read the saved layout, or save the requested one if there is none
+        
+        Args:
+            partition_seconds: Requested partition span, or None
+            index_interval: Requested index interval, or None
+            
+        Returns:
+            Dict with partition_seconds and index_interval
+        """
+        layout_path = os.path.join(self.path, LAYOUT_FILE)
+        if os.path.exists(layout_path):
+            with open(layout_path) as f:
+                layout = json.load(f)
+        else:
+            # New directories, and ones written before the layout was saved
+            layout = {
+                'partition_seconds': partition_seconds or 86400,
+                'index_interval': index_interval or 1024
+            }
+            
+        requested = {'partition_seconds': partition_seconds, 'index_interval': index_interval}
+        for name, value in requested.items():
+            if value is not None and value != layout[name]:
+                raise ValueError(f"{self.path} was created with {name}={layout[name]}, not {value}")
+                
+        if not os.path.exists(layout_path):
+            tmp_path = layout_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(layout, f)
+            os.replace(tmp_path, layout_path)
+        return layout
+        
+    def _partition(self, key):
+        """Get or create the partition starting at key"""
+        partition = self.partitions.get(key)
+        if partition is None:
+            name = from_epoch_micros(key).strftime(PARTITION_FORMAT)
+            partition = _Partition(os.path.join(self.data_path, name), self.index_interval)
+            self.partitions[key] = partition
+        return partition
+        
+    def _row_id(self, key, row):
+        """Build a point ID from its partition and row"""
+        return ((key // self.partition_micros) << 32) + row
+        
+    def _locate(self, point_id):
+        """Find the partition key and row of a point ID"""
+        return (point_id >> 32) * self.partition_micros, point_id & 0xFFFFFFFF
+        
+    def store_data_point(self, timestamp, value, is_anomaly=False):
+        """Append a data point
+        
+        Args:
+            timestamp: ISO format timestamp or datetime object
+            value: Numeric value of the data point
+            is_anomaly: Whether this point is an anomaly
+            
+        Returns:
+            ID of the stored point
+        """
+        return self.store_data_points([(timestamp, value, is_anomaly)])[0]
+        
+    def store_data_points(self, points):
+        """Append several data points
+        
+        Args:
+            points: List of (timestamp, value, is_anomaly) tuples
+            
+        Returns:
+            List of point IDs
+        """
+        if not points:
+            return []
+            
+        timestamps = np.fromiter((to_epoch_micros(p[0]) for p in points), dtype=np.int64, count=len(points))
+        values = np.fromiter((p[1] for p in points), dtype=np.float64, count=len(points))
+        flags = np.fromiter((FLAG_ANOMALY if p[2] else 0 for p in points), dtype=np.uint8, count=len(points))
+        keys = timestamps // self.partition_micros * self.partition_micros
+        
+        ids = [None] * len(points)
+        with COLUMNAR_WRITE_SECONDS.time(), self.lock:
+            # Split into runs of consecutive points sharing a partition
+            boundaries = np.flatnonzero(np.diff(keys)) + 1
+            for run_start, run_stop in zip(np.r_[0, boundaries], np.r_[boundaries, len(points)]):
+                key = int(keys[run_start])
+                partition = self._partition(key)
+                first_row = partition.rows
+                partition.append(timestamps[run_start:run_stop], values[run_start:run_stop], flags[run_start:run_stop])
+                for offset in range(run_stop - run_start):
+                    ids[run_start + offset] = self._row_id(key, first_row + offset)
+                    
+        return ids
+        
+    def _snapshot(self, start_us=None, end_us=None, reverse=False):
+        """Snapshot the partitions overlapping a time range
+        
+        Args:
+            start_us: Optional inclusive start in epoch microseconds
+            end_us: Optional exclusive end in epoch microseconds
+            reverse: Return the newest partition first
+            
+        Returns:
+            List of (key, partition, sorted, columns) tuples in partition order
+        """
+        with self.lock:
+            snapshots = []
+            for key in sorted(self.partitions, reverse=reverse):
+                if start_us is not None and key + self.partition_micros <= start_us:
+                    continue
+                if end_us is not None and key >= end_us:
+                    continue
+                partition = self.partitions[key]
+                snapshots.append((key, partition, *partition.snapshot()))
+            return snapshots
+            
+    def iter_range(self, start=None, end=None):
+        """Iterate over the partitions overlapping a time range
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            
+        Yields:
+            Tuples of (timestamps, values, flags, ids) per partition. For
+            partitions written in time order the arrays are zero-copy views
+            of the memory-mapped files.
+        """
+        start_us = to_epoch_micros(start) if start is not None else None
+        end_us = to_epoch_micros(end) if end is not None else None
+        
+        for snapshot in self._snapshot(start_us, end_us):
+            yield self._partition_range(*snapshot, start_us, end_us)
+            
+    def _partition_range(self, key, partition, is_sorted, columns, start_us, end_us):
+        """Slice a snapshotted partition to a time range in (timestamp, id) order
+        
+        Returns:
+            Tuple of (timestamps, values, flags, ids); zero-copy views for
+            partitions written in time order
+        """
+        timestamps = columns['timestamp']
+        values = columns['value']
+        flags = columns['flags']
+        base_id = self._row_id(key, 0)
+        
+        if is_sorted:
+            first, stop = partition.row_bounds(start_us, end_us, columns)
+            ids = np.arange(base_id + first, base_id + stop, dtype=np.int64)
+            return timestamps[first:stop], values[first:stop], flags[first:stop], ids
+            
+        # Out-of-order partition: filter and sort (copies)
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start_us is not None:
+            mask &= timestamps >= start_us
+        if end_us is not None:
+            mask &= timestamps < end_us
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(timestamps[rows], kind='stable')]
+        return timestamps[rows], values[rows], flags[rows], base_id + rows
+        
+    def read_range(self, start=None, end=None):
+        """Read the values of a time range as arrays
+        
+        A range inside a single sorted partition is returned as views of
+        the memory-mapped columns without copying.
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            
+        Returns:
+            Tuple of (timestamps, values) numpy arrays, timestamps as int64
+            microseconds since the epoch
+        """
+        parts = [(ts, values) for ts, values, _, _ in self.iter_range(start, end) if len(ts)]
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+        
+    def iter_point_arrays(self, start=None, end=None, after=None, chunk_size=10000):
+        """Stream data points in (timestamp, id) order as column arrays
+        
+        Chunks of partitions written in time order are zero-copy views of
+        the memory-mapped columns; chunks never span partitions.
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            after: Optional (timestamp, id) to resume strictly after
+            chunk_size: Maximum rows per chunk
+            
+        Yields:
+            Tuples of (ids, timestamps, values) numpy arrays, timestamps as
+            int64 microseconds since the epoch
+        """
+        if after is not None:
+            after_us, after_id = to_epoch_micros(after[0]), int(after[1])
+            if start is None or to_epoch_micros(start) < after_us:
+                start = from_epoch_micros(after_us)
+                
+        for timestamps, values, _, ids in self.iter_range(start, end):
+            first = 0
+            if after is not None:
+                # Rows are sorted by timestamp, and by ID among equal timestamps
+                ties = slice(
+                    int(np.searchsorted(timestamps, after_us, side='left')),
+                    int(np.searchsorted(timestamps, after_us, side='right'))
+                )
+                first = ties.start + int(np.searchsorted(ids[ties], after_id, side='right'))
+                
+            for i in range(first, len(timestamps), chunk_size):
+                yield ids[i:i + chunk_size], timestamps[i:i + chunk_size], values[i:i + chunk_size]
+                
+    def get_point_arrays_before(self, until, limit, start=None):
+        """Get the last points at or before a (timestamp, id) position
+        
+        Partitions are read newest first and only as far back as needed.
+        
+        Args:
+            until: Inclusive (timestamp, id) position
+            limit: Maximum number of points
+            start: Optional inclusive start timestamp
+            
+        Returns:
+            Tuple of (ids, timestamps, values) numpy arrays in (timestamp, id)
+            order, timestamps as int64 microseconds since the epoch
+        """
+        until_us, until_id = to_epoch_micros(until[0]), int(until[1])
+        start_us = to_epoch_micros(start) if start is not None else None
+        
+        parts = []
+        remaining = limit
+        for snapshot in self._snapshot(start_us, until_us + 1, reverse=True):
+            if remaining <= 0:
+                break
+            timestamps, values, _, ids = self._partition_range(*snapshot, start_us, until_us + 1)
+            
+            # Rows tied with until are sorted by ID; drop those after it
+            ties = int(np.searchsorted(timestamps, until_us, side='left'))
+            stop = ties + int(np.searchsorted(ids[ties:], until_id, side='right'))
+            first = max(stop - remaining, 0)
+            parts.append((ids[first:stop], timestamps[first:stop], values[first:stop]))
+            remaining -= stop - first
+            
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return tuple(np.concatenate(column) for column in zip(*reversed(parts)))
+        
+    def iter_data_points(self, start=None, end=None, after=None, chunk_size=10000):
+        """Stream data points in (timestamp, id) order
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            after: Optional (timestamp, id) to resume strictly after
+            chunk_size: Rows per chunk
+            
+        Yields:
+            Lists of (id, timestamp, value) tuples
+        """
+        chunk = []
+        for ids, timestamps, values in self.iter_point_arrays(start, end, after, chunk_size):
+            chunk.extend(
+                (int(point_id), from_epoch_micros(ts), float(value))
+                for point_id, ts, value in zip(ids, timestamps, values)
+            )
+            while len(chunk) >= chunk_size:
+                yield chunk[:chunk_size]
+                chunk = chunk[chunk_size:]
+                
+        if chunk:
+            yield chunk
+            
+    def _append_anomalies(self, records):
+        """Append anomaly records to the NDJSON log (caller holds the lock)
+        
+        Returns:
+            List of IDs of the appended records
+        """
+        if self.anomalies_file is None:
+            self.anomalies_file = open(self.anomalies_path, 'a')
+            
+        ids = []
+        for record in records:
+            self.anomaly_count += 1
+            record['id'] = self.anomaly_count
+            self.anomalies_file.write(json.dumps(record) + '\n')
+            ids.append(self.anomaly_count)
+        self.anomalies_file.flush()
+        return ids
+        
+    def store_anomaly(self, timestamp, data_point_id, score, model_type):
+        """Store an anomaly detection
+        
+        Args:
+            timestamp: ISO format timestamp or datetime object
+            data_point_id: ID of the related data point
+            score: Anomaly score
+            model_type: Type of detection model used
+            
+        Returns:
+            ID of the stored anomaly
+        """
+        with self.lock:
+            return self._append_anomalies([{
+                'timestamp': parse_timestamp(timestamp).isoformat(),
+                'data_point_id': data_point_id,
+                'score': float(score),
+                'model_type': model_type
+            }])[0]
+            
+    def store_anomalies(self, anomalies, checkpoint=None):
+        """Store several anomalies, optionally with a backfill checkpoint
+        
+        The anomalies are flushed before the checkpoint is replaced, so a
+        crash in between can at worst repeat one batch on resume.
+        
+        Args:
+            anomalies: List of (timestamp, data_point_id, score, model_type) tuples
+            checkpoint: Optional (job_id, last_timestamp, last_id)
+        """
+        with self.lock:
+            if anomalies:
+                self._append_anomalies([
+                    {
+                        'timestamp': parse_timestamp(ts).isoformat(),
+                        'data_point_id': data_point_id,
+                        'score': float(score),
+                        'model_type': model_type
+                    }
+                    for ts, data_point_id, score, model_type in anomalies
+                ])
+                os.fsync(self.anomalies_file.fileno())
+                
+            if checkpoint:
+                job_id, last_timestamp, last_id = checkpoint
+                checkpoints = self._read_checkpoints()
+                checkpoints[job_id] = [parse_timestamp(last_timestamp).isoformat(), last_id]
+                
+                tmp_path = self.checkpoints_path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(checkpoints, f)
+                os.replace(tmp_path, self.checkpoints_path)
+                
+    def store_incidents(self, incidents):
+        """Store anomaly incidents
+        
+        Args:
+            incidents: List of (start, end, stream, peak_score, point_count,
+                model_type) tuples
+        """
+        with self.lock:
+            self._append_anomalies([
+                {
+                    'timestamp': parse_timestamp(start).isoformat(),
+                    'end_timestamp': parse_timestamp(end).isoformat(),
+                    'stream': stream,
+                    'data_point_id': None,
+                    'score': float(score),
+                    'point_count': point_count,
+                    'model_type': model_type
+                }
+                for start, end, stream, score, point_count, model_type in incidents
+            ])
+            
+    def _read_checkpoints(self):
+        """Load all backfill checkpoints"""
+        if not os.path.exists(self.checkpoints_path):
+            return {}
+        with open(self.checkpoints_path) as f:
+            return json.load(f)
+            
+    def get_backfill_checkpoint(self, job_id):
+        """Get the saved progress of a backfill job
+        
+        Args:
+            job_id: Backfill job identifier
+            
+        Returns:
+            Tuple of (last_timestamp, last_id) or None
+        """
+        with self.lock:
+            checkpoint = self._read_checkpoints().get(job_id)
+        if checkpoint is None:
+            return None
+        return parse_timestamp(checkpoint[0]), checkpoint[1]
+        
+    def _lookup_value(self, point_id):
+        """Get the value of a stored point, or None if it does not exist"""
+        key, row = self._locate(point_id)
+        with self.lock:
+            partition = self.partitions.get(key)
+            if partition is None or row >= partition.rows:
+                return None
+            _, columns = partition.snapshot()
+        return float(columns['value'][row])
+        
+    def get_recent_data_points(self, limit=100):
+        """Get the most recent data points, newest first
+        
+        Args:
+            limit: Maximum number of points to retrieve
+            
+        Returns:
+            List of data point dicts
+        """
+        result = []
+        for key, _, is_sorted, columns in self._snapshot(reverse=True):
+            timestamps = columns['timestamp']
+            n_rows = len(timestamps)
+            take = min(limit - len(result), n_rows)
+            
+            # Sorted partitions keep their newest rows at the end
+            if is_sorted:
+                rows = np.arange(n_rows - 1, n_rows - 1 - take, -1)
+            else:
+                rows = np.argsort(timestamps, kind='stable')[::-1][:take]
+                
+            values = columns['value']
+            flags = columns['flags']
+            for row in rows:
+                result.append({
+                    'id': self._row_id(key, int(row)),
+                    'timestamp': from_epoch_micros(timestamps[row]).isoformat(),
+                    'value': float(values[row]),
+                    'is_anomaly': bool(flags[row] & FLAG_ANOMALY)
+                })
+                
+            if len(result) >= limit:
+                break
+                
+        return result
+        
+    def get_recent_anomalies(self, limit=20):
+        """Get the most recently stored anomalies, newest first
+        
+        Args:
+            limit: Maximum number of anomalies to retrieve
+            
+        Returns:
+            List of anomaly dicts
+        """
+        with self.lock:
+            if self.anomalies_file:
+                self.anomalies_file.flush()
+            if not os.path.exists(self.anomalies_path):
+                return []
+            with open(self.anomalies_path) as f:
+                lines = deque(f, maxlen=limit)
+                
+        result = []
+        for line in reversed(lines):
+            record = json.loads(line)
+            data_point_id = record.get('data_point_id')
+            result.append({
+                'id': record['id'],
+                'timestamp': record['timestamp'],
+                'score': record['score'],
+                'model_type': record['model_type'],
+                'value': self._lookup_value(data_point_id) if data_point_id is not None else None,
+                'data_point_id': data_point_id,
+                'end_timestamp': record.get('end_timestamp'),
+                'stream': record.get('stream'),
+                'point_count': record.get('point_count', 1)
+            })
+        return result
+        
+    def flush(self):
+        """Flush buffered writes to disk"""
+        with self.lock:
+            for partition in self.partitions.values():
+                partition.flush()
+            if self.anomalies_file:
+                self.anomalies_file.flush()
+                
+    def close(self):
+        """Close all open files"""
+        with self.lock:
+            for partition in self.partitions.values():
+                partition.close()
+            if self.anomalies_file:
+                self.anomalies_file.close()
+                self.anomalies_file = None
@@ -1,8 +1,12 @@
+import logging
 import time
 import numpy as np
 import threading
 from datetime import datetime
 from flask_socketio import emit
+from backend.services.replay_source import ReplaySource
+
+logger = logging.getLogger(__name__)
 
 class DataStream:
     """Service for generating and streaming data"""
@@ -14,6 +18,8 @@ class DataStream:
             socketio: SocketIO instance for emitting events
         """
         self.socketio = socketio
+        self.point_handler = None
+        self.replay_source = None
         self.simulation_thread = None
         self.stop_simulation = False
         
@@ -25,6 +31,15 @@ class DataStream:
         """
         self.socketio = socketio
         
+    def set_point_handler(self, handler):
+        """Set the function replayed points are passed to
+        
+        Args:
+            handler: Callable taking a data point dict, e.g. the server's
+                data_point handler
+        """
+        self.point_handler = handler
+        
     def generate_normal_data(self, n_points=1, n_features=1):
         """Generate normal data points
         
@@ -102,26 +117,69 @@ class DataStream:
             # Short delay to simulate real-time data
             time.sleep(0.1)
     
-    def start_simulation(self, n_points=1000, include_anomalies=True):
-        """Start data simulation in a background thread
+    def _replay_stream(self, source):
+        """Replay recorded data points
+        
+        Each point is emitted to clients and passed to the point handler,
+        so it takes the same path as points sent by a client.
         
         Args:
-            n_points: Total number of points to simulate
-            include_anomalies: Whether to include anomalies
+            source: ReplaySource to replay
         """
-        # Stop any existing simulation
-        self.stop_simulation = True
+        # Reset stop flag
+        self.stop_simulation = False
+        
+        try:
+            for point in source:
+                if self.stop_simulation:
+                    break
+                    
+                if self.socketio:
+                    self.socketio.emit('data_point', point)
+                if self.point_handler:
+                    self.point_handler(point)
+        except Exception:
+            logger.exception("Error replaying %s", source.path)
+            
+    def _start_thread(self, target, args):
+        """Stop any running stream and start target in a background thread"""
+        # Stop any existing stream
+        self.stop()
         if self.simulation_thread and self.simulation_thread.is_alive():
             self.simulation_thread.join(timeout=1.0)
             
-        # Start new simulation thread
-        self.simulation_thread = threading.Thread(
-            target=self._simulate_stream,
-            args=(n_points, include_anomalies)
-        )
+        # Start new stream thread
+        self.simulation_thread = threading.Thread(target=target, args=args)
         self.simulation_thread.daemon = True
         self.simulation_thread.start()
         
+    def start_simulation(self, n_points=1000, include_anomalies=True):
+        """Start data simulation in a background thread
+        
+        Args:
+            n_points: Total number of points to simulate
+            include_anomalies: Whether to include anomalies
+        """
+        self._start_thread(self._simulate_stream, (n_points, include_anomalies))
+        
+    def start_replay(self, path, speed=1.0, **source_kwargs):
+        """Start replaying a recording in a background thread
+        
+        Args:
+            path: Path of a CSV, NDJSON or Parquet recording
+            speed: Multiple of recorded speed, or 'max' to replay without delays
+            source_kwargs: Further ReplaySource arguments
+            
+        Returns:
+            ReplaySource being replayed
+        """
+        source = ReplaySource(path, speed=speed, **source_kwargs)
+        self._start_thread(self._replay_stream, (source,))
+        self.replay_source = source
+        return source
+        
     def stop(self):
-        """Stop the data simulation"""
-        self.stop_simulation = True
\ No newline at end of file
+        """Stop the data simulation or replay"""
+        self.stop_simulation = True
+        if self.replay_source:
+            self.replay_source.stop()
\ No newline at end of file
@@ -1,10 +1,17 @@
 import psycopg2
+import psycopg2.extras
 import redis
 import json
+import numpy as np
 from datetime import datetime
+from backend.services.metrics import registry
+from backend.services.storage import StorageBackend, to_epoch_micros
 
-class DatabaseService:
-    """Service for database operations"""
+# Metrics
+DB_WRITE_SECONDS = registry.histogram('db_write_seconds', 'Database write latency in seconds', ('table',))
+
+class DatabaseService(StorageBackend):
+    """Service for database operations on PostgreSQL/TimescaleDB and Redis"""
     
     def __init__(self, postgres_url=None, redis_url=None):
         """Initialize the database service
@@ -64,6 +71,24 @@ class DatabaseService:
                 )
             """)
             
+            # Incident columns; single-point anomalies leave the defaults
+            cursor.execute("""
+                ALTER TABLE anomalies
+                    ADD COLUMN IF NOT EXISTS end_timestamp TIMESTAMPTZ,
+                    ADD COLUMN IF NOT EXISTS stream VARCHAR(100),
+                    ADD COLUMN IF NOT EXISTS point_count INTEGER NOT NULL DEFAULT 1
+            """)
+            
+            # Create backfill progress table
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+                    job_id VARCHAR(100) PRIMARY KEY,
+                    last_timestamp TIMESTAMPTZ NOT NULL,
+                    last_id INTEGER NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                )
+            """)
+            
             self.postgres_conn.commit()
             
     def store_data_point(self, timestamp, value, is_anomaly=False):
@@ -84,7 +109,7 @@ class DatabaseService:
         if isinstance(timestamp, str):
             timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
             
-        with self.postgres_conn.cursor() as cursor:
+        with DB_WRITE_SECONDS.labels('data_points').time(), self.postgres_conn.cursor() as cursor:
             cursor.execute("""
                 INSERT INTO data_points (timestamp, value, is_anomaly)
                 VALUES (%s, %s, %s)
@@ -96,6 +121,31 @@ class DatabaseService:
             
             return row_id
             
+    def store_data_points(self, points):
+        """Bulk insert data points in a single transaction
+        
+        Args:
+            points: List of (timestamp, value, is_anomaly) tuples
+        """
+        if not points:
+            return
+            
+        if not self.postgres_conn:
+            self.connect_postgres()
+            
+        rows = [
+            (datetime.fromisoformat(ts.replace('Z', '+00:00')) if isinstance(ts, str) else ts, value, is_anomaly)
+            for ts, value, is_anomaly in points
+        ]
+        
+        with DB_WRITE_SECONDS.labels('data_points').time(), self.postgres_conn.cursor() as cursor:
+            psycopg2.extras.execute_values(cursor, """
+                INSERT INTO data_points (timestamp, value, is_anomaly)
+                VALUES %s
+            """, rows, page_size=1000)
+            
+            self.postgres_conn.commit()
+            
     def store_anomaly(self, timestamp, data_point_id, score, model_type):
         """Store an anomaly detection in PostgreSQL
         
@@ -115,7 +165,7 @@ class DatabaseService:
         if isinstance(timestamp, str):
             timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
             
-        with self.postgres_conn.cursor() as cursor:
+        with DB_WRITE_SECONDS.labels('anomalies').time(), self.postgres_conn.cursor() as cursor:
             cursor.execute("""
                 INSERT INTO anomalies (timestamp, data_point_id, score, model_type)
                 VALUES (%s, %s, %s, %s)
@@ -127,6 +177,191 @@ class DatabaseService:
             
             return row_id
             
+    def store_anomalies(self, anomalies, checkpoint=None):
+        """Bulk insert anomalies in a single transaction
+        
+        Args:
+            anomalies: List of (timestamp, data_point_id, score, model_type) tuples
+            checkpoint: Optional (job_id, last_timestamp, last_id) saved in
+                the same transaction, so a resumed job never double-inserts
+        """
+        if not self.postgres_conn:
+            self.connect_postgres()
+            
+        with DB_WRITE_SECONDS.labels('anomalies').time(), self.postgres_conn.cursor() as cursor:
+            if anomalies:
+                psycopg2.extras.execute_values(cursor, """
+                    INSERT INTO anomalies (timestamp, data_point_id, score, model_type)
+                    VALUES %s
+                """, anomalies, page_size=1000)
+                
+            if checkpoint:
+                cursor.execute("""
+                    INSERT INTO backfill_checkpoints (job_id, last_timestamp, last_id)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (job_id) DO UPDATE
+                    SET last_timestamp = EXCLUDED.last_timestamp,
+                        last_id = EXCLUDED.last_id,
+                        updated_at = NOW()
+                """, checkpoint)
+                
+            self.postgres_conn.commit()
+            
+    def store_incidents(self, incidents):
+        """Bulk insert anomaly incidents in a single transaction
+        
+        Args:
+            incidents: List of (start, end, stream, peak_score, point_count,
+                model_type) tuples
+        """
+        if not incidents:
+            return
+            
+        if not self.postgres_conn:
+            self.connect_postgres()
+            
+        with DB_WRITE_SECONDS.labels('anomalies').time(), self.postgres_conn.cursor() as cursor:
+            psycopg2.extras.execute_values(cursor, """
+                INSERT INTO anomalies (timestamp, end_timestamp, stream, score, point_count, model_type)
+                VALUES %s
+            """, incidents, page_size=1000)
+            
+            self.postgres_conn.commit()
+            
+    def get_backfill_checkpoint(self, job_id):
+        """Get the saved progress of a backfill job
+        
+        Args:
+            job_id: Backfill job identifier
+            
+        Returns:
+            Tuple of (last_timestamp, last_id) or None if the job has no checkpoint
+        """
+        if not self.postgres_conn:
+            self.connect_postgres()
+            
+        with self.postgres_conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT last_timestamp, last_id
+                FROM backfill_checkpoints
+                WHERE job_id = %s
+            """, (job_id,))
+            
+            row = cursor.fetchone()
+            self.postgres_conn.commit()
+            
+            return (row[0], row[1]) if row else None
+            
+    def iter_data_points(self, start=None, end=None, after=None, chunk_size=10000):
+        """Stream data points in time order using a server-side cursor
+        
+        Rows are fetched from the server chunk by chunk, so memory use does
+        not depend on the size of the time range. A dedicated connection is
+        used so commits on the main connection cannot close the cursor.
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            after: Optional (timestamp, id) to resume strictly after
+            chunk_size: Rows per chunk
+            
+        Yields:
+            Lists of (id, timestamp, value) tuples
+        """
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append("timestamp >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("timestamp < %s")
+            params.append(end)
+        if after is not None:
+            conditions.append("(timestamp, id) > (%s, %s)")
+            params.extend(after)
+            
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        
+        conn = psycopg2.connect(self.postgres_url)
+        try:
+            with conn.cursor(name='iter_data_points') as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(f"""
+                    SELECT id, timestamp, value
+                    FROM data_points
+                    {where}
+                    ORDER BY timestamp, id
+                """, params)
+                
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+        finally:
+            conn.close()
+            
+    def get_point_arrays_before(self, until, limit, start=None):
+        """Get the last points at or before a (timestamp, id) position
+        
+        Args:
+            until: Inclusive (timestamp, id) position
+            limit: Maximum number of points
+            start: Optional inclusive start timestamp
+            
+        Returns:
+            Tuple of (ids, timestamps, values) numpy arrays in (timestamp, id)
+            order, timestamps as int64 microseconds since the epoch
+        """
+        if not self.postgres_conn:
+            self.connect_postgres()
+            
+        conditions = ["(timestamp, id) <= (%s, %s)"]
+        params = list(until)
+        if start is not None:
+            conditions.append("timestamp >= %s")
+            params.append(start)
+            
+        with self.postgres_conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT id, timestamp, value
+                FROM data_points
+                WHERE {" AND ".join(conditions)}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT %s
+            """, params + [limit])
+            
+            rows = cursor.fetchall()[::-1]
+            self.postgres_conn.commit()
+            
+        return (
+            np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((to_epoch_micros(row[1]) for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        )
+        
+    def read_range(self, start=None, end=None, chunk_size=10000):
+        """Read the values of a time range as arrays
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            chunk_size: Rows fetched from the server at a time
+            
+        Returns:
+            Tuple of (timestamps, values) numpy arrays, timestamps as int64
+            microseconds since the epoch
+        """
+        timestamps = []
+        values = []
+        for rows in self.iter_data_points(start=start, end=end, chunk_size=chunk_size):
+            timestamps.append(np.fromiter((to_epoch_micros(row[1]) for row in rows), dtype=np.int64, count=len(rows)))
+            values.append(np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows)))
+            
+        if not timestamps:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return np.concatenate(timestamps), np.concatenate(values)
+        
     def cache_recent_data(self, data, key='recent_data', expire_seconds=3600):
         """Cache data in Redis
         
@@ -214,9 +449,10 @@ class DatabaseService:
         with self.postgres_conn.cursor() as cursor:
             cursor.execute("""
                 SELECT a.id, a.timestamp, a.score, a.model_type, 
-                       d.value, d.id as data_point_id
+                       d.value, d.id as data_point_id,
+                       a.end_timestamp, a.stream, a.point_count
                 FROM anomalies a
-                JOIN data_points d ON a.data_point_id = d.id
+                LEFT JOIN data_points d ON a.data_point_id = d.id
                 ORDER BY a.timestamp DESC
                 LIMIT %s
             """, (limit,))
@@ -232,7 +468,10 @@ class DatabaseService:
                     'score': row[2],
                     'model_type': row[3],
                     'value': row[4],
-                    'data_point_id': row[5]
+                    'data_point_id': row[5],
+                    'end_timestamp': row[6].isoformat() if row[6] else None,
+                    'stream': row[7],
+                    'point_count': row[8]
                 })
                 
             return result
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import deque
+from backend.services.metrics import registry
+
+# Metrics
+QUEUE_DEPTH = registry.gauge('ingest_queue_depth', 'Number of points waiting in the ingest queue')
+POINTS_SHED = registry.counter('points_shed_total', 'Data points shed by the ingest queue', ('policy',))
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'sample')
+
+class IngestQueue:
+    """Bounded queue between data ingest and anomaly detection"""
+    
+    def __init__(self, capacity=1000, policy='drop_oldest', block_timeout=1.0, sample_every=10):
+        """Initialize the ingest queue
+        
+        Args:
+            capacity: Maximum number of queued points
+            policy: What to do when full ('block', 'drop_oldest' or 'sample')
+            block_timeout: Seconds a producer waits for space under 'block'
+                before the point is shed (None waits forever)
+            sample_every: Under 'sample', admit one in this many points
+                while the queue is full
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+            
+        self.capacity = capacity
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.sample_every = max(1, sample_every)
+        
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.overflow_count = 0
+        self.shed_count = 0
+        
+    def __len__(self):
+        return len(self.items)
+        
+    def _shed(self, reason):
+        """Record a shed point (caller holds the condition)"""
+        self.shed_count += 1
+        POINTS_SHED.labels(reason).inc()
+        
+    def put(self, item):
+        """Add an item, applying the overflow policy if the queue is full
+        
+        Args:
+            item: Item to enqueue
+            
+        Returns:
+            True if the item was queued, False if it was shed
+        """
+        with self.condition:
+            if len(self.items) >= self.capacity:
+                if self.policy == 'block':
+                    deadline = None if self.block_timeout is None else time.monotonic() + self.block_timeout
+                    while len(self.items) >= self.capacity:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self._shed('block')
+                            return False
+                        self.condition.wait(remaining)
+                        
+                elif self.policy == 'drop_oldest':
+                    self.items.popleft()
+                    self._shed('drop_oldest')
+                    
+                else:
+                    # Keep one in every sample_every points while overloaded
+                    self.overflow_count += 1
+                    if self.overflow_count % self.sample_every:
+                        self._shed('sample')
+                        return False
+                    self.items.popleft()
+                    self._shed('sample')
+            else:
+                self.overflow_count = 0
+                
+            self.items.append(item)
+            QUEUE_DEPTH.set(len(self.items))
+            self.condition.notify_all()
+            return True
+            
+    def wait(self, timeout=None):
+        """Wait until at least one item is queued
+        
+        Args:
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if items are available
+        """
+        with self.condition:
+            if not self.items:
+                self.condition.wait(timeout)
+            return bool(self.items)
+            
+    def get_batch(self, max_items):
+        """Remove up to max_items from the front of the queue without waiting
+        
+        Args:
+            max_items: Maximum number of items to return
+            
+        Returns:
+            List of items in arrival order
+        """
+        with self.condition:
+            count = min(max_items, len(self.items))
+            batch = [self.items.popleft() for _ in range(count)]
+            QUEUE_DEPTH.set(len(self.items))
+            
+            # Wake producers blocked on a full queue
+            if batch:
+                self.condition.notify_all()
+            return batch
+            
+    def wake(self):
+        """Wake any thread blocked in wait()"""
+        with self.condition:
+            self.condition.notify_all()
@@ -0,0 +1,384 @@
+import bisect
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class _ThreadToken:
+    """Per-thread object whose collection signals that the thread exited"""
+
+
+class _PerThreadCells:
+    """Per-thread storage cells that are summed on collection
+    
+    Each thread writes only to its own cell, so updates on the hot path
+    take no lock. The lock is only taken the first time a thread touches
+    the metric, when a thread exits and when cells are collected. Cells
+    of exited threads are folded into a retired total, so short-lived
+    threads (e.g. one per Socket.IO event) do not accumulate cells.
+    """
+    
+    def __init__(self, size):
+        """Initialize cell storage
+        
+        Args:
+            size: Number of float slots per cell
+        """
+        self.size = size
+        self.local = threading.local()
+        self.cells = {}
+        self.retired = [0.0] * size
+        self.lock = threading.Lock()
+        
+    def get(self):
+        """Get the calling thread's cell, creating it on first use"""
+        cell = getattr(self.local, 'cell', None)
+        if cell is None:
+            cell = [0.0] * self.size
+            with self.lock:
+                self.cells[id(cell)] = cell
+                
+            # Thread-local values are released when the thread exits,
+            # which collects the token and retires the cell
+            token = _ThreadToken()
+            weakref.finalize(token, self._retire, cell)
+            self.local.token = token
+            self.local.cell = cell
+        return cell
+        
+    def _retire(self, cell):
+        """Fold the cell of an exited thread into the retired total"""
+        with self.lock:
+            if self.cells.pop(id(cell), None) is None:
+                return
+            for i, value in enumerate(cell):
+                self.retired[i] += value
+                
+    @property
+    def cell_count(self):
+        """Number of live per-thread cells"""
+        with self.lock:
+            return len(self.cells)
+            
+    def collect(self):
+        """Sum all cells slot by slot
+        
+        Returns:
+            List of summed slot values
+        """
+        with self.lock:
+            cells = list(self.cells.values())
+            totals = list(self.retired)
+            
+        for cell in cells:
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+
+class Counter:
+    """Monotonically increasing counter"""
+    
+    kind = 'counter'
+    
+    def __init__(self):
+        """Initialize the counter"""
+        self._cells = _PerThreadCells(1)
+        
+    def inc(self, amount=1):
+        """Increment the counter
+        
+        Args:
+            amount: Amount to add
+        """
+        self._cells.get()[0] += amount
+        
+    @property
+    def value(self):
+        """Current counter value"""
+        return self._cells.collect()[0]
+
+
+class Gauge:
+    """Value that can go up and down"""
+    
+    kind = 'gauge'
+    
+    def __init__(self):
+        """Initialize the gauge"""
+        self._value = 0.0
+        
+    def set(self, value):
+        """Set the gauge
+        
+        Args:
+            value: New value
+        """
+        self._value = float(value)
+        
+    @property
+    def value(self):
+        """Current gauge value"""
+        return self._value
+
+
+class Histogram:
+    """Histogram with fixed bucket boundaries"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize the histogram
+        
+        Args:
+            buckets: Sorted upper bounds of the buckets
+        """
+        self.buckets = tuple(sorted(buckets))
+        
+        # One slot per bucket, one for +Inf, then sum and count
+        self._cells = _PerThreadCells(len(self.buckets) + 3)
+        
+    def observe(self, value):
+        """Record an observation
+        
+        Args:
+            value: Observed value
+        """
+        cell = self._cells.get()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+        
+    @contextmanager
+    def time(self):
+        """Context manager that observes the elapsed seconds of its block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+            
+    def snapshot(self):
+        """Get cumulative bucket counts, sum and count
+        
+        Returns:
+            Dict with 'buckets' as (upper bound, cumulative count) pairs,
+            'sum' and 'count'
+        """
+        totals = self._cells.collect()
+        
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), totals[:-2]):
+            running += count
+            cumulative.append((bound, int(running)))
+            
+        return {'buckets': cumulative, 'sum': totals[-2], 'count': int(totals[-1])}
+
+
+class MetricFamily:
+    """A named metric with optional labels"""
+    
+    def __init__(self, name, documentation, factory, labelnames=()):
+        """Initialize the metric family
+        
+        Args:
+            name: Metric name
+            documentation: Help text
+            factory: Callable creating a new child metric
+            labelnames: Names of the labels
+        """
+        self.name = name
+        self.documentation = documentation
+        self.factory = factory
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self.lock = threading.Lock()
+        
+        # Unlabelled families proxy straight to a single child
+        self.kind = factory().kind
+        if not self.labelnames:
+            self.children[()] = factory()
+            
+    def labels(self, *values):
+        """Get the child metric for a set of label values
+        
+        Args:
+            values: Label values in the order of labelnames
+            
+        Returns:
+            Child metric instance
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"Expected labels {self.labelnames}, got {values}")
+            
+        key = tuple(str(v) for v in values)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self.factory())
+        return child
+        
+    def __getattr__(self, attr):
+        # Forward inc/set/observe/time to the unlabelled child
+        if attr in ('inc', 'set', 'observe', 'time', 'value', 'snapshot'):
+            return getattr(self.labels(), attr)
+        raise AttributeError(attr)
+
+
+def _format_labels(labelnames, values, extra=None):
+    """Format a Prometheus label set"""
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+        
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_bound(bound):
+    """Format a bucket bound the way Prometheus expects"""
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+class MetricsRegistry:
+    """Registry of named metrics"""
+    
+    def __init__(self, prefix='anomaly_'):
+        """Initialize the registry
+        
+        Args:
+            prefix: Prefix added to every metric name
+        """
+        self.prefix = prefix
+        self.families = {}
+        self.lock = threading.Lock()
+        
+    def _get_or_create(self, name, documentation, factory, labelnames):
+        """Get a metric family, registering it if needed"""
+        full_name = self.prefix + name
+        with self.lock:
+            family = self.families.get(full_name)
+            if family is None:
+                family = MetricFamily(full_name, documentation, factory, labelnames)
+                self.families[full_name] = family
+        return family
+        
+    def counter(self, name, documentation, labelnames=()):
+        """Get or create a counter
+        
+        Args:
+            name: Metric name without prefix
+            documentation: Help text
+            labelnames: Names of the labels
+            
+        Returns:
+            MetricFamily of counters
+        """
+        return self._get_or_create(name, documentation, Counter, labelnames)
+        
+    def gauge(self, name, documentation, labelnames=()):
+        """Get or create a gauge
+        
+        Args:
+            name: Metric name without prefix
+            documentation: Help text
+            labelnames: Names of the labels
+            
+        Returns:
+            MetricFamily of gauges
+        """
+        return self._get_or_create(name, documentation, Gauge, labelnames)
+        
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Get or create a histogram
+        
+        Args:
+            name: Metric name without prefix
+            documentation: Help text
+            labelnames: Names of the labels
+            buckets: Bucket upper bounds
+            
+        Returns:
+            MetricFamily of histograms
+        """
+        return self._get_or_create(name, documentation, lambda: Histogram(buckets), labelnames)
+        
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format
+        
+        Returns:
+            Exposition text
+        """
+        with self.lock:
+            families = sorted(self.families.values(), key=lambda f: f.name)
+            
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            
+            with family.lock:
+                children = sorted(family.children.items())
+                
+            for values, child in children:
+                if family.kind == 'histogram':
+                    snap = child.snapshot()
+                    for bound, count in snap['buckets']:
+                        labels = _format_labels(family.labelnames, values, ('le', _format_bound(bound)))
+                        lines.append(f"{family.name}_bucket{labels} {count}")
+                    labels = _format_labels(family.labelnames, values)
+                    lines.append(f"{family.name}_sum{labels} {snap['sum']}")
+                    lines.append(f"{family.name}_count{labels} {snap['count']}")
+                else:
+                    labels = _format_labels(family.labelnames, values)
+                    lines.append(f"{family.name}{labels} {child.value}")
+                    
+        return '\n'.join(lines) + '\n'
+        
+    def snapshot(self):
+        """Get all metric values as a JSON-serializable dict
+        
+        Returns:
+            Dict keyed by metric name
+        """
+        with self.lock:
+            families = list(self.families.values())
+            
+        result = {}
+        for family in families:
+            with family.lock:
+                children = list(family.children.items())
+                
+            series = []
+            for values, child in children:
+                entry = {'labels': dict(zip(family.labelnames, values))}
+                if family.kind == 'histogram':
+                    snap = child.snapshot()
+                    entry.update({
+                        'buckets': [[_format_bound(b), c] for b, c in snap['buckets']],
+                        'sum': snap['sum'],
+                        'count': snap['count']
+                    })
+                else:
+                    entry['value'] = child.value
+                series.append(entry)
+            result[family.name] = {'type': family.kind, 'series': series}
+            
+        return result
+
+
+# Process-wide registry used by the services
+registry = MetricsRegistry()
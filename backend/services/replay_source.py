@@ -0,0 +1,202 @@
+import csv
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from backend.services.metrics import registry
+from backend.services.storage import to_utc_datetime
+
+# Metrics
+REPLAY_POINTS = registry.counter('replay_points_total', 'Recorded data points replayed')
+REPLAY_LAG_SECONDS = registry.histogram('replay_lag_seconds', 'Delay of replayed points behind their schedule in seconds')
+
+FORMATS = ('csv', 'ndjson', 'parquet')
+
+
+def parse_speed(speed):
+    """Parse a replay speed
+    
+    Args:
+        speed: Multiple of recorded speed, or 'max' to replay without delays
+        
+    Returns:
+        Positive float, or None for max speed
+    """
+    if speed is None or str(speed).lower() == 'max':
+        return None
+    speed = float(speed)
+    if speed <= 0:
+        raise ValueError(f"Replay speed must be positive or 'max', got {speed}")
+    return speed
+
+
+def infer_format(path):
+    """Infer the file format from a path's extension
+    
+    Args:
+        path: Path of a recording
+        
+    Returns:
+        'csv', 'ndjson' or 'parquet'
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    elif extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    elif extension in ('.parquet', '.pq'):
+        return 'parquet'
+    else:
+        raise ValueError(f"Cannot infer replay format of {path}; pass one of {FORMATS}")
+
+
+def _to_bool(value):
+    """Interpret a recorded anomaly flag"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 't', 'yes')
+    return bool(value)
+
+
+class ReplaySource:
+    """Replays recorded data points from a file
+    
+    Recordings are CSV, NDJSON or Parquet files with a timestamp and a
+    value per point, and optionally an anomaly flag. They are parsed
+    lazily in chunks, so files larger than memory can be replayed. Points
+    are paced against an absolute schedule derived from their recorded
+    timestamps, which keeps inter-arrival times intact without
+    accumulating sleep error.
+    """
+    
+    def __init__(self, path, format=None, speed=1.0, chunk_size=10000, rebase_timestamps=True,
+                 timestamp_field='timestamp', value_field='value', anomaly_field='is_anomaly'):
+        """Initialize the replay source
+        
+        Args:
+            path: Path of the recording
+            format: 'csv', 'ndjson' or 'parquet' (inferred from the extension if None)
+            speed: Multiple of recorded speed, or 'max' to replay without delays
+            chunk_size: Records parsed at a time
+            rebase_timestamps: Move timestamps onto the replay schedule, so the
+                replay starts now and each point carries the time it is due;
+                at max speed the recorded spacing is kept from now
+            timestamp_field: Name of the timestamp column (ISO strings or epoch seconds)
+            value_field: Name of the value column
+            anomaly_field: Name of the optional anomaly flag column
+        """
+        self.path = path
+        self.format = format or infer_format(path)
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown replay format: {self.format}")
+        self.speed = parse_speed(speed)
+        self.chunk_size = chunk_size
+        self.rebase_timestamps = rebase_timestamps
+        self.timestamp_field = timestamp_field
+        self.value_field = value_field
+        self.anomaly_field = anomaly_field
+        
+        self.stopped = threading.Event()
+        
+    def stop(self):
+        """Stop the replay, interrupting any wait for the next point"""
+        self.stopped.set()
+        
+    def _read_csv(self):
+        """Yield chunks of records from a CSV file"""
+        with open(self.path, newline='') as f:
+            reader = csv.DictReader(f)
+            while True:
+                chunk = list(itertools.islice(reader, self.chunk_size))
+                if not chunk:
+                    return
+                yield chunk
+                
+    def _read_ndjson(self):
+        """Yield chunks of records from a newline-delimited JSON file"""
+        with open(self.path) as f:
+            lines = (line for line in f if line.strip())
+            while True:
+                chunk = [json.loads(line) for line in itertools.islice(lines, self.chunk_size)]
+                if not chunk:
+                    return
+                yield chunk
+                
+    def _read_parquet(self):
+        """Yield chunks of records from a Parquet file"""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Replaying Parquet files requires pyarrow (pip install pyarrow)") from e
+            
+        parquet_file = pq.ParquetFile(self.path)
+        names = set(parquet_file.schema_arrow.names)
+        columns = [self.timestamp_field, self.value_field]
+        if self.anomaly_field in names:
+            columns.append(self.anomaly_field)
+            
+        for batch in parquet_file.iter_batches(batch_size=self.chunk_size, columns=columns):
+            yield batch.to_pylist()
+            
+    def iter_chunks(self):
+        """Read the recording in chunks without pacing
+        
+        Yields:
+            Lists of (timestamp, value, is_anomaly) tuples, timestamps as
+            aware UTC datetimes in recorded order
+        """
+        reader = {'csv': self._read_csv, 'ndjson': self._read_ndjson, 'parquet': self._read_parquet}[self.format]
+        for records in reader():
+            yield [
+                (
+                    to_utc_datetime(record[self.timestamp_field]),
+                    float(record[self.value_field]),
+                    _to_bool(record.get(self.anomaly_field) or False)
+                )
+                for record in records
+            ]
+            
+    def __iter__(self):
+        """Replay the recording at the configured speed
+        
+        Yields:
+            Data point dicts with timestamp, value and is_anomaly, each at
+            its scheduled time
+        """
+        first_time = None
+        start = None
+        start_time = None
+        
+        for chunk in self.iter_chunks():
+            for timestamp, value, is_anomaly in chunk:
+                if self.stopped.is_set():
+                    return
+                    
+                if first_time is None:
+                    first_time = timestamp
+                    start = time.monotonic()
+                    start_time = datetime.now(timezone.utc)
+                    
+                # Wait until the point is due; out-of-order points are sent at once
+                elapsed = (timestamp - first_time).total_seconds()
+                if self.speed is not None:
+                    elapsed /= self.speed
+                    delay = start + elapsed - time.monotonic()
+                    if delay > 0 and self.stopped.wait(delay):
+                        return
+                    REPLAY_LAG_SECONDS.observe(max(0.0, -delay))
+                    
+                # Stamp the point with its due time rather than shifting the
+                # recording, which at Nx speed would run ahead of the clock
+                if self.rebase_timestamps:
+                    timestamp = start_time + timedelta(seconds=elapsed)
+                    
+                REPLAY_POINTS.inc()
+                # Naive UTC, like the timestamps of the simulated stream
+                yield {
+                    'timestamp': timestamp.astimezone(timezone.utc).replace(tzinfo=None).isoformat(),
+                    'value': value,
+                    'is_anomaly': is_anomaly
+                }
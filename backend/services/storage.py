@@ -0,0 +1,282 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_timestamp(timestamp):
+    """Convert an ISO string to a datetime, passing datetimes through
+    
+    Args:
+        timestamp: ISO format timestamp or datetime object
+        
+    Returns:
+        datetime object
+    """
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    return timestamp
+
+
+def to_utc_datetime(timestamp):
+    """Convert an ISO string, epoch seconds or datetime to an aware UTC datetime
+    
+    Naive timestamps are taken to be UTC, matching the simulated stream;
+    timestamps with another offset are converted.
+    
+    Args:
+        timestamp: ISO format timestamp, epoch seconds (number or numeric
+            string) or datetime object
+        
+    Returns:
+        Timezone-aware datetime in UTC
+        
+    Raises:
+        ValueError: If a string is neither epoch seconds nor ISO format
+    """
+    if isinstance(timestamp, (int, float)):
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    if isinstance(timestamp, str):
+        try:
+            return datetime.fromtimestamp(float(timestamp), tz=timezone.utc)
+        except ValueError:
+            pass
+    timestamp = parse_timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def to_epoch_micros(timestamp):
+    """Convert a timestamp to integer microseconds since the epoch
+    
+    Naive datetimes are taken to be UTC, matching the simulated stream.
+    
+    Args:
+        timestamp: ISO format timestamp or datetime object
+        
+    Returns:
+        int microseconds
+    """
+    timestamp = parse_timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - EPOCH) // EPOCH.resolution
+
+
+def from_epoch_micros(micros):
+    """Convert integer microseconds since the epoch to a UTC datetime
+    
+    Args:
+        micros: Microseconds since the epoch
+        
+    Returns:
+        Timezone-aware datetime
+    """
+    return datetime.fromtimestamp(int(micros) // 1_000_000, tz=timezone.utc).replace(
+        microsecond=int(micros) % 1_000_000
+    )
+
+
+class StorageBackend(ABC):
+    """Interface shared by the storage backends
+    
+    DatabaseService implements it on PostgreSQL/TimescaleDB and
+    ColumnarStorage on local memory-mapped column files. Services only
+    rely on these methods, so either backend can be plugged in.
+    """
+    
+    @abstractmethod
+    def store_data_point(self, timestamp, value, is_anomaly=False):
+        """Store a data point
+        
+        Args:
+            timestamp: ISO format timestamp or datetime object
+            value: Numeric value of the data point
+            is_anomaly: Whether this point is an anomaly
+            
+        Returns:
+            ID of the stored point
+        """
+        
+    @abstractmethod
+    def store_data_points(self, points):
+        """Store several data points at once
+        
+        Args:
+            points: List of (timestamp, value, is_anomaly) tuples
+        """
+        
+    @abstractmethod
+    def store_anomaly(self, timestamp, data_point_id, score, model_type):
+        """Store an anomaly detection
+        
+        Args:
+            timestamp: ISO format timestamp or datetime object
+            data_point_id: ID of the related data point
+            score: Anomaly score
+            model_type: Type of detection model used
+            
+        Returns:
+            ID of the stored anomaly
+        """
+        
+    @abstractmethod
+    def store_anomalies(self, anomalies, checkpoint=None):
+        """Store several anomalies, optionally with a backfill checkpoint
+        
+        Args:
+            anomalies: List of (timestamp, data_point_id, score, model_type) tuples
+            checkpoint: Optional (job_id, last_timestamp, last_id) saved atomically
+                with the anomalies
+        """
+        
+    @abstractmethod
+    def store_incidents(self, incidents):
+        """Store anomaly incidents
+        
+        Args:
+            incidents: List of (start, end, stream, peak_score, point_count,
+                model_type) tuples
+        """
+        
+    @abstractmethod
+    def get_backfill_checkpoint(self, job_id):
+        """Get the saved progress of a backfill job
+        
+        Args:
+            job_id: Backfill job identifier
+            
+        Returns:
+            Tuple of (last_timestamp, last_id) or None
+        """
+        
+    @abstractmethod
+    def iter_data_points(self, start=None, end=None, after=None, chunk_size=10000):
+        """Stream data points in (timestamp, id) order
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            after: Optional (timestamp, id) to resume strictly after
+            chunk_size: Rows per chunk
+            
+        Yields:
+            Lists of (id, timestamp, value) tuples
+        """
+        
+    def iter_point_arrays(self, start=None, end=None, after=None, chunk_size=10000):
+        """Stream data points in (timestamp, id) order as column arrays
+        
+        Backends that store columns natively override this to avoid
+        building a Python object per row; the default converts the chunks
+        of iter_data_points.
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            after: Optional (timestamp, id) to resume strictly after
+            chunk_size: Maximum rows per chunk
+            
+        Yields:
+            Tuples of (ids, timestamps, values) numpy arrays, timestamps as
+            int64 microseconds since the epoch
+        """
+        for rows in self.iter_data_points(start=start, end=end, after=after, chunk_size=chunk_size):
+            yield (
+                np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+                np.fromiter((to_epoch_micros(row[1]) for row in rows), dtype=np.int64, count=len(rows)),
+                np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+            )
+            
+    def get_point_arrays_before(self, until, limit, start=None):
+        """Get the last points at or before a (timestamp, id) position
+        
+        Used to seed the history a sequence model needs in front of the
+        first point after a checkpoint. Backends override this with a
+        backwards read; the default scans the range up to until.
+        
+        Args:
+            until: Inclusive (timestamp, id) position
+            limit: Maximum number of points
+            start: Optional inclusive start timestamp
+            
+        Returns:
+            Tuple of (ids, timestamps, values) numpy arrays in (timestamp, id)
+            order, timestamps as int64 microseconds since the epoch
+        """
+        tail = [np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)]
+        if limit <= 0:
+            return tuple(tail)
+            
+        until_us, until_id = to_epoch_micros(until[0]), int(until[1])
+        for chunk in self.iter_point_arrays(start=start, end=from_epoch_micros(until_us + 1)):
+            # Keep the whole last chunk, since rows tied with until may be dropped
+            tail = [np.concatenate([kept[-limit:], new]) for kept, new in zip(tail, chunk)]
+            
+        ids, timestamps, values = tail
+        keep = (timestamps < until_us) | (ids <= until_id)
+        return ids[keep][-limit:], timestamps[keep][-limit:], values[keep][-limit:]
+        
+    @abstractmethod
+    def read_range(self, start=None, end=None):
+        """Read the values of a time range as arrays
+        
+        Args:
+            start: Optional inclusive start timestamp
+            end: Optional exclusive end timestamp
+            
+        Returns:
+            Tuple of (timestamps, values) numpy arrays, timestamps as int64
+            microseconds since the epoch
+        """
+        
+    @abstractmethod
+    def get_recent_data_points(self, limit=100):
+        """Get the most recent data points, newest first
+        
+        Args:
+            limit: Maximum number of points to retrieve
+            
+        Returns:
+            List of data point dicts
+        """
+        
+    @abstractmethod
+    def get_recent_anomalies(self, limit=20):
+        """Get the most recent anomalies, newest first
+        
+        Args:
+            limit: Maximum number of anomalies to retrieve
+            
+        Returns:
+            List of anomaly dicts
+        """
+        
+    @abstractmethod
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+def create_storage(backend, postgres_url=None, redis_url=None, path=None):
+    """Create a storage backend by name
+    
+    Args:
+        backend: 'timescaledb' or 'columnar'
+        postgres_url: PostgreSQL connection URL for 'timescaledb'
+        redis_url: Redis connection URL for 'timescaledb'
+        path: Data directory for 'columnar'
+        
+    Returns:
+        StorageBackend instance
+    """
+    if backend == 'timescaledb':
+        from backend.services.db_service import DatabaseService
+        return DatabaseService(postgres_url=postgres_url, redis_url=redis_url)
+    elif backend == 'columnar':
+        from backend.services.columnar_storage import ColumnarStorage
+        return ColumnarStorage(path)
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
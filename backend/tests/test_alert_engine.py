@@ -0,0 +1,165 @@
+import time
+from datetime import datetime, timedelta
+
+from backend.services.alert_engine import AlertEngine
+
+
+class RecordingSocketIO:
+    def __init__(self):
+        self.events = []
+        
+    def emit(self, event, payload):
+        self.events.append((event, payload))
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.incidents = []
+        
+    def store_incidents(self, incidents):
+        self.incidents.extend(incidents)
+
+
+START = datetime(2024, 1, 1)
+
+
+def _timestamps(first, count):
+    return [(START + timedelta(seconds=first + i)).isoformat() for i in range(count)]
+
+
+def _engine(**kwargs):
+    socketio = RecordingSocketIO()
+    storage = RecordingStorage()
+    kwargs.setdefault('emit_interval', 0)
+    engine = AlertEngine('isolation_forest', socketio=socketio, db_service=storage, **kwargs)
+    return engine, socketio, storage
+
+
+def _process(engine, first, predictions, scores=None, threshold=0.5):
+    scores = scores or [0.9 if p == -1 else 0.1 for p in predictions]
+    values = [float(s) for s in scores]
+    engine.process('s', _timestamps(first, len(predictions)), values, predictions, scores, threshold)
+
+
+def test_consecutive_anomalies_merge_into_one_incident():
+    engine, socketio, storage = _engine()
+    
+    _process(engine, 0, [1, -1, -1, -1, 1], scores=[0.1, 0.6, 0.9, 0.7, 0.1])
+    engine.flush()
+    
+    opened = [p for e, p in socketio.events if e == 'anomaly_detected']
+    assert len(opened) == 1
+    assert opened[0]['status'] == 'closed'
+    assert opened[0]['point_count'] == 3
+    assert opened[0]['score'] == 0.9
+    assert opened[0]['index'] == 2
+    assert opened[0]['start'] == _timestamps(1, 1)[0]
+    assert opened[0]['end'] == _timestamps(3, 1)[0]
+    assert len(storage.incidents) == 1
+    assert storage.incidents[0][4] == 3
+
+
+def test_gap_tolerance_keeps_incident_open():
+    engine, socketio, storage = _engine(gap_tolerance=1)
+    
+    _process(engine, 0, [-1, 1, -1, 1, 1])
+    engine.flush()
+    
+    assert len(storage.incidents) == 1
+    assert storage.incidents[0][4] == 2
+
+
+def test_points_seen_in_earlier_windows_are_skipped():
+    engine, socketio, storage = _engine()
+    
+    # Overlapping windows: points 0-4, then 2-6
+    _process(engine, 0, [1, 1, -1, 1, 1])
+    _process(engine, 2, [-1, 1, 1, 1, -1])
+    engine.flush(close_open=True)
+    
+    assert [row[4] for row in storage.incidents] == [1, 1]
+    assert [row[0] for row in storage.incidents] == [START + timedelta(seconds=2), START + timedelta(seconds=6)]
+
+
+def test_open_incident_updates_are_rate_limited():
+    engine, socketio, storage = _engine(emit_interval=3600)
+    
+    _process(engine, 0, [-1, -1])
+    _process(engine, 2, [-1], scores=[5.0])
+    _process(engine, 3, [1])
+    
+    events = [e for e, p in socketio.events]
+    assert events == ['anomaly_detected', 'incident_closed']
+    assert socketio.events[-1][1]['score'] == 5.0
+    
+    # A later incident in the same interval is held back, but still persisted
+    _process(engine, 4, [-1, 1])
+    engine.flush()
+    assert len(socketio.events) == 2
+    assert len(storage.incidents) == 2
+
+
+def test_held_back_incident_is_sent_when_the_interval_passes():
+    engine, socketio, storage = _engine(emit_interval=0.05)
+    
+    # A noise incident is emitted, then a spike closes within the interval
+    _process(engine, 0, [-1, 1], scores=[0.6, 0.1])
+    _process(engine, 2, [-1, 1], scores=[6.0, 0.1])
+    assert [p['score'] for e, p in socketio.events] == [0.6]
+    
+    time.sleep(0.06)
+    engine.flush_if_due()
+    
+    assert [(e, p['status'], p['score']) for e, p in socketio.events] == [
+        ('anomaly_detected', 'closed', 0.6),
+        ('anomaly_detected', 'closed', 6.0)
+    ]
+
+
+def test_most_severe_held_back_incident_is_kept():
+    engine, socketio, storage = _engine(emit_interval=3600)
+    
+    _process(engine, 0, [-1, 1], scores=[0.6, 0.1])
+    _process(engine, 2, [-1, 1, -1, 1, -1, 1], scores=[6.0, 0.1, 0.7, 0.1, 0.8, 0.1])
+    engine.flush(close_open=True)
+    
+    assert [p['score'] for e, p in socketio.events] == [0.6, 6.0]
+    assert len(storage.incidents) == 4
+
+
+def test_threshold_is_carried_over_when_missing():
+    engine, socketio, storage = _engine()
+    
+    _process(engine, 0, [1, 1], threshold=0.5)
+    _process(engine, 2, [-1], threshold=None)
+    engine.flush(close_open=True)
+    
+    assert [e for e, p in socketio.events] == ['anomaly_detected', 'incident_closed']
+    assert [p['threshold'] for e, p in socketio.events] == [0.5, 0.5]
+
+
+def test_reset_stream_accepts_earlier_timestamps():
+    engine, socketio, storage = _engine()
+    
+    # A replay that ran ahead of the clock, then a fresh run
+    _process(engine, 100, [1, -1])
+    engine.reset_stream('s')
+    _process(engine, 0, [-1, 1])
+    engine.flush()
+    
+    assert [row[0] for row in storage.incidents] == [START + timedelta(seconds=101), START]
+
+
+def test_failed_incident_writes_are_logged_with_traceback(caplog):
+    engine, socketio, storage = _engine()
+    
+    def store_incidents(incidents):
+        raise ConnectionError('database unavailable')
+        
+    storage.store_incidents = store_incidents
+    _process(engine, 0, [-1, 1])
+    engine.flush()
+    
+    record, = [r for r in caplog.records if r.name == 'backend.services.alert_engine']
+    assert record.getMessage() == 'Error storing 1 incidents'
+    assert record.exc_info[0] is ConnectionError
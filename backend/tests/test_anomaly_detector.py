@@ -0,0 +1,112 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+
+WINDOW = 100
+
+
+def _run(detector_class, values, step=10):
+    """Feed values to a detector, scoring every step points once a window is full"""
+    detector = detector_class(window_size=WINDOW, alert_emit_interval=0)
+    for i, value in enumerate(values):
+        detector.add_data_point(float(value), f"2024-01-01T00:00:00.{i:06d}")
+        if i + 1 >= WINDOW and (i + 1) % step == 0:
+            detector.detect_anomalies()
+    return detector
+
+
+def _noise(n, seed=0):
+    return np.random.default_rng(seed).normal(0.0, 0.1, n)
+
+
+def test_level_shift_leads_to_exactly_one_refit(detector_class):
+    values = _noise(1200)
+    values[400:] += 1.0
+    
+    detector = _run(detector_class, values)
+    
+    state = detector.drift_state()
+    assert state['streams']['default']['drift_count'] == 1
+    assert detector.refit_count == 1
+    assert state['refit_pending'] is False
+    assert 400 <= datetime.fromisoformat(state['last_drift']).microsecond < 400 + WINDOW
+
+
+def test_every_drift_on_a_seasonal_stream_is_refitted(detector_class):
+    i = np.arange(1500)
+    values = np.sin(i / 10) + _noise(1500)
+    
+    detector = _run(detector_class, values)
+    
+    # Each drift refits once; only the last may still be pending
+    drifts = detector.drift_state()['streams']['default']['drift_count']
+    pending = int(detector.points_until_refit is not None)
+    assert detector.refit_count == drifts - pending
+
+
+def test_flagged_spike_does_not_refit(detector_class):
+    values = _noise(800)
+    values[400:410] += 5.0
+    
+    detector = _run(detector_class, values)
+    
+    assert detector.last_drift is None
+    assert detector.refit_count == 0
+
+
+def test_pending_refit_is_not_postponed_by_later_drifts(detector_class):
+    detector = _run(detector_class, _noise(200))
+    detector.points_until_refit = 30
+    monitor = detector.drift_monitors.get(detector.stream)
+    statistic = monitor.statistic
+    
+    # Scores far above the reference would signal drift again
+    detector._update_drift(['t'] * 50, np.full(50, 10.0), np.ones(50))
+    
+    assert detector.points_until_refit == 30
+    assert monitor.statistic == pytest.approx(statistic)
+
+
+def test_timestamps_are_normalized_to_utc(detector_class):
+    detector = detector_class(window_size=WINDOW)
+    for timestamp in ('1704067200', '2024-01-01T00:00:01Z', '2024-01-01T02:00:02+02:00',
+                      '2024-01-01T00:00:03', 1704067204.0, None):
+        detector.add_data_point(1.0, timestamp)
+    with pytest.raises(ValueError):
+        detector.add_data_point(1.0, 'yesterday')
+        
+    timestamps = [timestamp for timestamp, value in detector.ingest_queue.get_batch(10)]
+    
+    assert all(timestamp.utcoffset().total_seconds() == 0 for timestamp in timestamps)
+    assert [timestamp.second for timestamp in timestamps[:5]] == [0, 1, 2, 3, 4]
+    assert timestamps == sorted(timestamps)
+
+
+def test_detection_loop_survives_alert_errors(detector_class):
+    detector = detector_class(window_size=WINDOW)
+    calls = []
+    
+    def process(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise TypeError("can't compare offset-naive and offset-aware datetimes")
+            
+    detector.alert_engine.process = process
+    detector.start_detection(interval=0.01)
+    try:
+        for value in _noise(20):
+            detector.add_data_point(float(value))
+            time.sleep(0.005)
+        deadline = time.monotonic() + 5.0
+        while len(calls) < 2 and time.monotonic() < deadline:
+            detector.add_data_point(0.0)
+            time.sleep(0.02)
+            
+        assert len(calls) >= 2
+        assert detector.detection_thread.is_alive()
+    finally:
+        detector.stop()
+        detector.detection_thread.join(timeout=1.0)
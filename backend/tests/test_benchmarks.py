@@ -0,0 +1,38 @@
+import json
+
+from backend.benchmarks import bench_service, run_benchmarks
+
+
+def test_every_suite_runs_with_tiny_sizes(tmp_path):
+    output = tmp_path / 'bench.json'
+    
+    exit_code = run_benchmarks.main([
+        '--suites', *run_benchmarks.SUITES,
+        '--window-sizes', '20',
+        '--iterations', '2',
+        '--load-rate', '200',
+        '--load-duration', '0.2',
+        '--output', str(output)
+    ])
+    
+    assert exit_code == 0
+    report = json.loads(output.read_text())
+    assert report['results']
+
+
+def test_timed_detection_passes_score_one_new_point(detector_class, monkeypatch):
+    new_counts = []
+    detect_anomalies = detector_class.detect_anomalies
+    
+    def recording_detect(self, data=None):
+        outcome = detect_anomalies(self, data)
+        new_counts.append(self.last_new_count)
+        return outcome
+        
+    monkeypatch.setattr(detector_class, 'detect_anomalies', recording_detect)
+    
+    bench_service.bench_detector([50], iterations=5)
+    
+    # The fitting pass scores the first window; every timed pass one point
+    assert new_counts[0] == 50
+    assert new_counts[1:] and set(new_counts[1:]) == {1}
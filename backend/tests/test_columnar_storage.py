@@ -0,0 +1,184 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from backend.services.columnar_storage import ColumnarStorage
+from backend.services.storage import StorageBackend, to_epoch_micros
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _points(offsets, value_offset=0.0):
+    return [(START + timedelta(seconds=s), float(s) + value_offset, False) for s in offsets]
+
+
+def _micros(seconds):
+    return to_epoch_micros(START + timedelta(seconds=seconds))
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = ColumnarStorage(str(tmp_path), partition_seconds=100, index_interval=8)
+    yield storage
+    storage.close()
+
+
+def test_row_bounds_matches_linear_scan(storage):
+    storage.store_data_points(_points(range(0, 100, 3)))
+    partition = storage.partitions[_micros(0)]
+    with storage.lock:
+        _, columns = partition.snapshot()
+    timestamps = np.asarray(columns['timestamp'])
+    
+    for start in (None, 0, 1, 3, 50, 98, 99):
+        for end in (None, 0, 4, 51, 99, 100):
+            start_us = None if start is None else _micros(start)
+            end_us = None if end is None else _micros(end)
+            
+            first, stop = partition.row_bounds(start_us, end_us, columns)
+            
+            expected = np.flatnonzero(
+                (timestamps >= (start_us if start_us is not None else timestamps.min()))
+                & (timestamps < (end_us if end_us is not None else timestamps.max() + 1))
+            )
+            if len(expected):
+                assert (first, stop) == (expected[0], expected[-1] + 1)
+            else:
+                assert first >= stop
+
+
+def test_read_range_spans_partitions(storage):
+    storage.store_data_points(_points(range(0, 350, 5)))
+    
+    timestamps, values = storage.read_range(START + timedelta(seconds=90), START + timedelta(seconds=260))
+    
+    assert list(values) == [float(s) for s in range(90, 260, 5)]
+    assert list(timestamps) == [_micros(s) for s in range(90, 260, 5)]
+
+
+def test_single_partition_read_is_zero_copy(storage):
+    storage.store_data_points(_points(range(0, 50)))
+    
+    _, values = storage.read_range(START, START + timedelta(seconds=20))
+    
+    assert isinstance(values.base, np.memmap) or isinstance(values, np.memmap)
+
+
+def test_out_of_order_writes_are_returned_sorted(storage):
+    storage.store_data_points(_points([10, 20, 30]))
+    storage.store_data_points(_points([15, 5, 25]))
+    
+    timestamps, values = storage.read_range()
+    
+    assert list(values) == [5.0, 10.0, 15.0, 20.0, 25.0, 30.0]
+    assert not storage.partitions[_micros(0)].sorted
+
+
+def test_reopen_keeps_data_ids_and_layout(tmp_path):
+    storage = ColumnarStorage(str(tmp_path), partition_seconds=100, index_interval=8)
+    first_ids = storage.store_data_points(_points(range(0, 150, 10)))
+    storage.store_data_points(_points([5]))
+    storage.close()
+    
+    # Reopening with the defaults keeps the saved layout
+    reopened = ColumnarStorage(str(tmp_path))
+    assert reopened.partition_seconds == 100
+    assert reopened.index_interval == 8
+    
+    new_ids = reopened.store_data_points(_points([155, 205]))
+    assert not set(new_ids) & set(first_ids)
+    
+    _, values = reopened.read_range()
+    assert list(values) == [0.0, 5.0] + [float(s) for s in range(10, 150, 10)] + [155.0, 205.0]
+    assert not reopened.partitions[_micros(0)].sorted
+    assert reopened.partitions[_micros(100)].sorted
+    reopened.close()
+
+
+def test_reopen_rejects_a_different_layout(tmp_path):
+    ColumnarStorage(str(tmp_path), partition_seconds=100).close()
+    
+    with pytest.raises(ValueError):
+        ColumnarStorage(str(tmp_path), partition_seconds=3600)
+
+
+def test_iter_point_arrays_resumes_after_checkpoint(storage):
+    ids = storage.store_data_points(_points([0, 1, 1, 1, 2, 150, 151]))
+    
+    chunks = list(storage.iter_point_arrays(after=(START + timedelta(seconds=1), ids[2]), chunk_size=2))
+    
+    assert [list(chunk_ids) for chunk_ids, _, _ in chunks] == [[ids[3], ids[4]], [ids[5], ids[6]]]
+    assert all(len(chunk_ids) <= 2 for chunk_ids, _, _ in chunks)
+
+
+def test_points_before_a_checkpoint_match_a_forward_scan(storage):
+    ids = storage.store_data_points(_points([0, 1, 1, 1, 2, 150, 151, 250, 5]))
+    
+    for until, limit, start in [
+        ((START + timedelta(seconds=1), ids[2]), 3, None),
+        ((START + timedelta(seconds=151), ids[6]), 4, None),
+        ((START + timedelta(seconds=250), ids[7]), 20, None),
+        ((START + timedelta(seconds=150), ids[5]), 5, START + timedelta(seconds=2)),
+        ((START + timedelta(seconds=1), ids[1]), 0, None)
+    ]:
+        fast = storage.get_point_arrays_before(until, limit, start=start)
+        scanned = StorageBackend.get_point_arrays_before(storage, until, limit, start=start)
+        
+        for fast_column, scanned_column in zip(fast, scanned):
+            assert list(fast_column) == list(scanned_column)
+            
+    recent_ids, _, values = storage.get_point_arrays_before((START + timedelta(seconds=1), ids[2]), 3)
+    assert list(recent_ids) == [ids[0], ids[1], ids[2]]
+    assert list(values) == [0.0, 1.0, 1.0]
+
+
+def test_iter_data_points_matches_point_arrays(storage):
+    ids = storage.store_data_points(_points(range(0, 250, 7)))
+    
+    rows = [row for chunk in storage.iter_data_points(chunk_size=4) for row in chunk]
+    
+    assert [row[0] for row in rows] == ids
+    assert rows[3][1] == START + timedelta(seconds=21)
+    assert rows[3][2] == 21.0
+
+
+def test_reads_are_consistent_with_a_concurrent_writer(storage):
+    stop = threading.Event()
+    errors = []
+    
+    def write():
+        # Millisecond spacing keeps the writer inside a few partitions
+        i = 0
+        while not stop.is_set():
+            storage.store_data_points([
+                (START + timedelta(milliseconds=i + k), float(i + k), False) for k in range(5)
+            ])
+            i += 5
+            
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        for _ in range(2000):
+            try:
+                timestamps, values = storage.read_range()
+                assert len(timestamps) == len(values)
+                storage.get_recent_data_points(limit=10)
+            except Exception as e:
+                errors.append(e)
+    finally:
+        stop.set()
+        writer.join()
+        
+    assert errors == []
+
+
+def test_incomplete_backend_fails_on_construction():
+    class ReadOnlyStorage(StorageBackend):
+        def read_range(self, start=None, end=None):
+            return np.empty(0), np.empty(0)
+            
+    with pytest.raises(TypeError):
+        ReadOnlyStorage()
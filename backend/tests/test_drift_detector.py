@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from backend.ml_models.drift_detector import DriftMonitors, PageHinkleyDriftDetector
+
+
+def _feed(detector, values, anomalous=()):
+    """Feed values, returning the indices where drift was detected"""
+    return [i for i, value in enumerate(values) if detector.update(value, is_anomaly=i in anomalous)]
+
+
+def _noise(n, seed=0, loc=0.0):
+    return np.random.default_rng(seed).normal(loc, 0.1, n)
+
+
+def test_stationary_stream_does_not_drift():
+    detector = PageHinkleyDriftDetector()
+    
+    assert _feed(detector, _noise(5000)) == []
+    assert detector.state()['reference_std'] == pytest.approx(0.1, rel=0.3)
+
+
+def test_level_shift_is_detected():
+    detector = PageHinkleyDriftDetector()
+    values = np.concatenate([_noise(200), _noise(200, seed=1, loc=0.2)])
+    
+    drifts = _feed(detector, values)
+    
+    assert len(drifts) >= 1
+    assert 200 <= drifts[0] < 220
+
+
+def test_large_shift_is_confirmed_after_max_burst():
+    detector = PageHinkleyDriftDetector(max_burst=20)
+    values = np.concatenate([_noise(200), _noise(200, seed=1, loc=1.0)])
+    
+    drifts = _feed(detector, values)
+    
+    assert len(drifts) >= 1
+    assert 220 <= drifts[0] < 230
+
+
+def test_flagged_burst_is_not_drift_and_stays_out_of_reference():
+    detector = PageHinkleyDriftDetector()
+    values = _noise(400)
+    values[100:110] += 5.0
+    
+    drifts = _feed(detector, values, anomalous=set(range(100, 110)))
+    
+    assert drifts == []
+    assert detector.state()['reference_std'] == pytest.approx(0.1, rel=0.3)
+
+
+def test_unflagged_outlier_burst_is_not_drift():
+    detector = PageHinkleyDriftDetector()
+    values = _noise(400)
+    values[100:110] += 5.0
+    
+    # The model stopped flagging halfway through the burst
+    drifts = _feed(detector, values, anomalous=set(range(100, 105)))
+    
+    assert drifts == []
+    assert detector.state()['reference_std'] == pytest.approx(0.1, rel=0.3)
+
+
+def test_sustained_flagged_run_is_drift():
+    detector = PageHinkleyDriftDetector(max_burst=20)
+    values = np.concatenate([_noise(200), _noise(200, seed=1, loc=1.0)])
+    
+    # The old model flags every point after the shift
+    drifts = _feed(detector, values, anomalous=set(range(200, 400)))
+    
+    assert len(drifts) >= 1
+    assert 220 <= drifts[0] < 230
+
+
+def test_monitors_are_per_stream():
+    monitors = DriftMonitors(warmup_samples=10)
+    for value in _noise(20):
+        monitors.get('a').update(value)
+        
+    state = monitors.state()
+    assert state['a']['warm'] is True
+    assert 'b' not in state
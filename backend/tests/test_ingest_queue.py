@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from backend.services.ingest_queue import IngestQueue
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        IngestQueue(capacity=10, policy='lifo')
+
+
+def test_get_batch_returns_items_in_arrival_order():
+    queue = IngestQueue(capacity=10)
+    for i in range(5):
+        queue.put(i)
+        
+    assert queue.get_batch(3) == [0, 1, 2]
+    assert queue.get_batch(10) == [3, 4]
+    assert queue.get_batch(10) == []
+
+
+def test_drop_oldest_keeps_newest_items():
+    queue = IngestQueue(capacity=3, policy='drop_oldest')
+    
+    results = [queue.put(i) for i in range(5)]
+    
+    assert results == [True] * 5
+    assert queue.get_batch(10) == [2, 3, 4]
+    assert queue.shed_count == 2
+
+
+def test_sample_admits_one_in_sample_every_while_full():
+    queue = IngestQueue(capacity=2, policy='sample', sample_every=3)
+    
+    results = [queue.put(i) for i in range(8)]
+    
+    # 0 and 1 fill the queue; of the six overflowing points every third is admitted
+    assert results == [True, True, False, False, True, False, False, True]
+    assert queue.get_batch(10) == [4, 7]
+    assert queue.shed_count == 6
+
+
+def test_sample_resets_once_there_is_room():
+    queue = IngestQueue(capacity=1, policy='sample', sample_every=2)
+    queue.put('a')
+    assert queue.put('b') is False
+    
+    queue.get_batch(1)
+    assert queue.put('c') is True
+    assert queue.put('d') is False
+
+
+def test_block_sheds_after_timeout():
+    queue = IngestQueue(capacity=1, policy='block', block_timeout=0.05)
+    queue.put(1)
+    
+    start = time.monotonic()
+    assert queue.put(2) is False
+    
+    assert time.monotonic() - start >= 0.05
+    assert queue.shed_count == 1
+    assert queue.get_batch(10) == [1]
+
+
+def test_block_waits_for_consumer():
+    queue = IngestQueue(capacity=1, policy='block', block_timeout=5.0)
+    queue.put(1)
+    
+    consumer = threading.Timer(0.05, queue.get_batch, args=(1,))
+    consumer.start()
+    try:
+        assert queue.put(2) is True
+    finally:
+        consumer.join()
+        
+    assert queue.get_batch(10) == [2]
+    assert queue.shed_count == 0
+
+
+def test_wait_returns_when_item_arrives():
+    queue = IngestQueue(capacity=10)
+    
+    assert queue.wait(timeout=0.01) is False
+    
+    producer = threading.Timer(0.05, queue.put, args=(1,))
+    producer.start()
+    try:
+        assert queue.wait(timeout=5.0) is True
+    finally:
+        producer.join()
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from backend.services.metrics import MetricsRegistry
+
+
+def _run_in_threads(fn, n_threads):
+    """Run fn once in each of n_threads short-lived threads"""
+    for _ in range(n_threads):
+        thread = threading.Thread(target=fn)
+        thread.start()
+        thread.join()
+
+
+def test_counter_sums_across_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter('events_total', 'Events')
+    
+    _run_in_threads(lambda: counter.inc(2), 10)
+    counter.inc()
+    
+    assert counter.value == 21
+
+
+def test_exited_thread_cells_are_retired():
+    registry = MetricsRegistry()
+    counter = registry.counter('events_total', 'Events')
+    histogram = registry.histogram('latency_seconds', 'Latency')
+    
+    def work():
+        counter.inc()
+        histogram.observe(0.01)
+        
+    _run_in_threads(work, 200)
+    
+    assert counter.labels()._cells.cell_count == 0
+    assert histogram.labels()._cells.cell_count == 0
+    assert counter.value == 200
+    assert histogram.snapshot()['count'] == 200
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+        
+    snapshot = histogram.snapshot()
+    assert snapshot['buckets'] == [(0.1, 1), (1.0, 2), (float('inf'), 3)]
+    assert snapshot['count'] == 3
+    assert snapshot['sum'] == pytest.approx(5.55)
+
+
+def test_render_prometheus_labels():
+    registry = MetricsRegistry(prefix='test_')
+    registry.counter('writes_total', 'Writes', ('table',)).labels('anomalies').inc(3)
+    
+    text = registry.render_prometheus()
+    
+    assert '# TYPE test_writes_total counter' in text
+    assert 'test_writes_total{table="anomalies"} 3' in text
@@ -0,0 +1,93 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.services.replay_source import ReplaySource, parse_speed
+
+
+def _write_recording(path, seconds):
+    start = datetime(2024, 1, 1)
+    lines = ['timestamp,value,is_anomaly']
+    lines += [f"{(start + timedelta(seconds=s)).isoformat()},{i},{int(i == 1)}" for i, s in enumerate(seconds)]
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+def _elapsed(points):
+    first = datetime.fromisoformat(points[0]['timestamp'])
+    return [(datetime.fromisoformat(p['timestamp']) - first).total_seconds() for p in points]
+
+
+def test_parse_speed():
+    assert parse_speed('max') is None
+    assert parse_speed('2') == 2.0
+    with pytest.raises(ValueError):
+        parse_speed(0)
+
+
+def test_csv_records_are_parsed(tmp_path):
+    path = _write_recording(tmp_path / 'rec.csv', [0, 1, 2])
+    
+    points = list(ReplaySource(path, speed='max', rebase_timestamps=False))
+    
+    assert [p['value'] for p in points] == [0.0, 1.0, 2.0]
+    assert [p['is_anomaly'] for p in points] == [False, True, False]
+    assert points[0]['timestamp'] == '2024-01-01T00:00:00'
+
+
+def test_rebased_timestamps_follow_the_replay_schedule(tmp_path):
+    path = _write_recording(tmp_path / 'rec.csv', [0, 1, 2, 3])
+    
+    before = datetime.now(timezone.utc).replace(tzinfo=None)
+    points = list(ReplaySource(path, speed=20))
+    after = datetime.now(timezone.utc).replace(tzinfo=None)
+    
+    # Recorded seconds are compressed 20x, so no point is stamped in the future
+    assert _elapsed(points) == pytest.approx([0, 0.05, 0.1, 0.15])
+    assert before <= datetime.fromisoformat(points[0]['timestamp'])
+    assert datetime.fromisoformat(points[-1]['timestamp']) <= after
+
+
+def test_max_speed_keeps_recorded_spacing(tmp_path):
+    path = _write_recording(tmp_path / 'rec.csv', [0, 10, 20])
+    
+    points = list(ReplaySource(path, speed='max'))
+    
+    assert _elapsed(points) == [0, 10, 20]
+
+
+def test_ndjson_offsets_are_converted_to_utc(tmp_path):
+    path = tmp_path / 'rec.ndjson'
+    records = [
+        {'timestamp': '2024-01-01T02:00:00+02:00', 'value': 1},
+        {'timestamp': '2024-01-01T00:00:01Z', 'value': 2, 'is_anomaly': True},
+        {'timestamp': 1704067202, 'value': 3}
+    ]
+    path.write_text('\n'.join(json.dumps(record) for record in records) + '\n\n')
+    
+    points = list(ReplaySource(str(path), speed='max', rebase_timestamps=False))
+    
+    assert [p['timestamp'] for p in points] == [
+        '2024-01-01T00:00:00', '2024-01-01T00:00:01', '2024-01-01T00:00:02'
+    ]
+    assert [p['is_anomaly'] for p in points] == [False, True, False]
+
+
+def test_parquet_is_read_in_chunks(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    start = datetime(2024, 1, 1, 2, tzinfo=timezone(timedelta(hours=2)))
+    table = pa.table({
+        'timestamp': [start + timedelta(seconds=i) for i in range(5)],
+        'value': [float(i) for i in range(5)]
+    })
+    path = str(tmp_path / 'rec.parquet')
+    pq.write_table(table, path)
+    
+    source = ReplaySource(path, speed='max', chunk_size=2, rebase_timestamps=False)
+    
+    assert [len(chunk) for chunk in source.iter_chunks()] == [2, 2, 1]
+    points = list(source)
+    assert points[0]['timestamp'] == '2024-01-01T00:00:00'
+    assert [p['value'] for p in points] == [0.0, 1.0, 2.0, 3.0, 4.0]
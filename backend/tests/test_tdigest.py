@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from backend.ml_models.streaming_threshold import StreamingThreshold
+from backend.ml_models.tdigest import TDigest
+
+
+def _digest(values, compression=100):
+    digest = TDigest(compression=compression)
+    digest.update_many(values)
+    return digest
+
+
+@pytest.mark.parametrize('q', [0.01, 0.1, 0.5, 0.9, 0.95, 0.99, 0.999])
+def test_quantile_accuracy_normal(q):
+    values = np.random.default_rng(0).normal(size=100_000)
+    digest = _digest(values)
+    
+    # Rank error, which t-digest keeps small near the tails
+    estimate = digest.quantile(q)
+    assert abs(np.mean(values <= estimate) - q) < 0.01
+
+
+def test_quantile_accuracy_skewed():
+    values = np.random.default_rng(1).exponential(size=50_000)
+    digest = _digest(values)
+    
+    for q in (0.5, 0.95, 0.99):
+        assert digest.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+
+
+def test_extremes_and_empty():
+    assert TDigest().quantile(0.5) is None
+    assert TDigest().cdf(1.0) is None
+    
+    digest = _digest([3.0, 1.0, 2.0])
+    assert digest.quantile(0.0) == 1.0
+    assert digest.quantile(1.0) == 3.0
+    assert digest.cdf(0.0) == 0.0
+    assert digest.cdf(3.0) == 1.0
+
+
+def test_cdf_many_matches_cdf():
+    digest = _digest(np.random.default_rng(2).normal(size=5000))
+    points = [-10.0, -1.0, 0.0, 0.5, 10.0]
+    
+    fractions = digest.cdf_many(points + [np.nan])
+    
+    assert fractions[:-1] == pytest.approx([digest.cdf(p) for p in points])
+    assert np.isnan(fractions[-1])
+
+
+def test_merge_matches_single_digest():
+    rng = np.random.default_rng(3)
+    parts = [rng.normal(loc, size=20_000) for loc in (0.0, 1.0, 5.0)]
+    merged = _digest(parts[0])
+    for part in parts[1:]:
+        merged.merge(_digest(part))
+        
+    values = np.concatenate(parts)
+    assert merged.count == len(values)
+    assert merged.min == values.min()
+    assert merged.max == values.max()
+    for q in (0.1, 0.5, 0.9, 0.99):
+        assert abs(np.mean(values <= merged.quantile(q)) - q) < 0.01
+
+
+def test_serialization_round_trip():
+    digest = _digest(np.random.default_rng(4).normal(size=10_000))
+    
+    restored = TDigest.from_dict(digest.to_dict())
+    
+    for q in (0.05, 0.5, 0.95):
+        assert restored.quantile(q) == pytest.approx(digest.quantile(q))
+
+
+def test_streaming_threshold_warms_up_and_flags_tail():
+    threshold = StreamingThreshold(quantile=0.9, min_samples=100)
+    assert threshold.predict(np.arange(10.0)) is None
+    
+    threshold.update(np.arange(1000.0))
+    
+    assert threshold.value == pytest.approx(900, rel=0.02)
+    predictions = threshold.predict(np.array([10.0, 950.0]))
+    assert list(predictions) == [1, -1]
@@ -127,6 +127,7 @@ const ControlPanel: React.FC<ControlPanelProps> = ({
               >
                 <option value="isolation_forest">Isolation Forest</option>
                 <option value="lstm">LSTM</option>
+                <option value="ensemble">Ensemble</option>
               </select>
             </div>
             
@@ -12,6 +12,12 @@ export interface AnomalyDetection {
   score: number;
   threshold: number;
   index: number;
+  incident_id?: string;
+  stream?: string;
+  status?: 'open' | 'closed';
+  start?: string;
+  end?: string;
+  point_count?: number;
 }
 
 // Socket event handlers
@@ -36,7 +42,7 @@ export interface SimulationSettings {
 
 // Application settings
 export interface AppSettings {
-  modelType: 'isolation_forest' | 'lstm';
+  modelType: 'isolation_forest' | 'lstm' | 'ensemble';
   windowSize: number;
   threshold: number;
 }
\ No newline at end of file